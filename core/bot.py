@@ -1,6 +1,7 @@
 import logging
 
-from core.constants import POOL_TIMEOUT
+from core.constants import JETTON_SYNC_POLL_INTERVAL, POOL_TIMEOUT
+from telegram import Update
 from telegram.ext import (
     ApplicationBuilder,
     Application,
@@ -12,8 +13,16 @@ from core.handlers.callback import handlers as callback_handlers
 from core.handlers.error import error_handler
 from core.not_telegram_ext.limiter import NotAIORateLimiter
 from core.not_telegram_ext.processor import MyUpdateProcessor
+from core.services.blockchain import BLOCKCHAIN_SERVICE_KEY, BlockchainService
 from core.settings import Config
-from core.tasks.blockchain import fetch_jetton_holders, fetch_nft_owners
+from core.tasks.blockchain import (
+    JettonSyncState,
+    fetch_nft_owners,
+    sanity_admins_check,
+    sanity_chat_members_check,
+    watch_jetton_holders,
+)
+from core.utils.executor import db_executor
 
 logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO
@@ -39,11 +48,23 @@ class NotBot:
             .token(token)
             .concurrent_updates(MyUpdateProcessor(Config.CONCURRENT_UPDATES))
             .rate_limiter(rate_limiter)
+            .post_init(self.post_init)
+            .post_shutdown(self.post_shutdown)
             .build()
         )
         self.configure_handlers()
         self.configure_tasks()
 
+    @staticmethod
+    async def post_init(application: Application) -> None:
+        application.bot_data[BLOCKCHAIN_SERVICE_KEY] = BlockchainService()
+
+    @staticmethod
+    async def post_shutdown(application: Application) -> None:
+        if blockchain_service := application.bot_data.pop(BLOCKCHAIN_SERVICE_KEY, None):
+            await blockchain_service.close()
+        db_executor.shutdown(wait=True, cancel_futures=True)
+
     def configure_handlers(self):
         self.application.add_handlers(
             [
@@ -57,17 +78,31 @@ class NotBot:
 
     def configure_tasks(self):
         self.application.job_queue.run_repeating(
-            fetch_jetton_holders, interval=60 * 60, first=2
+            watch_jetton_holders,
+            interval=JETTON_SYNC_POLL_INTERVAL,
+            first=2,
+            data=JettonSyncState(),
+        )
+        self.application.job_queue.run_repeating(
+            fetch_nft_owners, interval=Config.NFT_OWNERS_SYNC_INTERVAL, first=30 * 60
+        )
+        # Whale changes are reconciled after each jetton sync, this is a safety net
+        self.application.job_queue.run_repeating(
+            sanity_admins_check, interval=Config.ADMINS_SWEEP_INTERVAL, first=10 * 60
         )
         self.application.job_queue.run_repeating(
-            fetch_nft_owners, interval=60 * 60, first=30 * 60
+            sanity_chat_members_check,
+            interval=Config.CHAT_MEMBERS_SWEEP_INTERVAL,
+            first=15 * 60,
         )
 
     def start_polling(self):
-        self.application.run_polling()
+        # `chat_member` updates are only sent when requested explicitly
+        self.application.run_polling(allowed_updates=Update.ALL_TYPES)
 
     def run_webhook(self):
         self.application.run_webhook(
+            allowed_updates=Update.ALL_TYPES,
             listen=Config.WEBHOOK_HOST,
             port=Config.WEBHOOK_PORT,
             url_path=Config.TELEGRAM_BOT_TOKEN,
@@ -1,3 +1,26 @@
 POOL_TIMEOUT = 30
 DEFAULT_CONNECT_TIMEOUT = 180
 DEFAULT_EXPIRY_TIMEOUT_MINUTES = 30
+DB_BULK_CHUNK_SIZE = 1000
+TON_API_MAX_PAGE_RETRIES = 10
+TON_API_RETRY_DELAY = 1
+TON_API_BASE_URL = "https://tonapi.io/"
+TON_API_TIMEOUT = 30
+NFT_OWNERS_CHECKPOINT = "nft_owners"
+# Share of the collection a run has to see to prove it was not cut off
+NFT_OWNERS_MIN_COVERAGE = 0.95
+SYNC_CHECKPOINT_TTL = 24 * 60 * 60
+JETTON_SYNC_POLL_INTERVAL = 60
+# Holders may come and go during a scan, a shorter one was cut off
+JETTON_HOLDERS_MIN_COVERAGE = 0.99
+LOOP_LAG_PROBE_INTERVAL = 0.1
+ELIGIBILITY_KEY = "eligibility"
+ELIGIBILITY_REBUILD_TTL = 60 * 60
+WHALE_CHANGES_STREAM = "whale_changes"
+WHALE_CHANGES_STREAM_MAXLEN = 100_000
+WHALE_CHANGES_BATCH_SIZE = 100
+USER_CHUNK_SIZE = 500
+CHAT_MEMBERS_SWEEP_CURSOR = "chat_members_sweep"
+MEMBERSHIP_CACHE_KEY = "chat_member"
+MEMBERSHIP_LOCAL_CACHE_TTL = 30
+MEMBERSHIP_LOCAL_CACHE_SIZE = 10_000
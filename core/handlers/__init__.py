@@ -1,5 +1,6 @@
-from telegram.ext import ChatJoinRequestHandler
+from telegram.ext import ChatJoinRequestHandler, ChatMemberHandler
 
+from core.handlers.chat_member import chat_member_callback
 from core.handlers.join_request import chat_join_request_callback
 
 handlers = [
@@ -7,4 +8,5 @@ handlers = [
         chat_join_request_callback,
         # chat_id=Config.TARGET_COMMON_CHAT_ID,
     ),
+    ChatMemberHandler(chat_member_callback, ChatMemberHandler.CHAT_MEMBER),
 ]
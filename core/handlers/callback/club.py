@@ -1,6 +1,5 @@
 import logging
 
-from pytonapi.utils import userfriendly_to_raw
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, ChatInviteLink
 from telegram.ext import ContextTypes
 
@@ -8,8 +7,8 @@ from core.constants import DEFAULT_EXPIRY_TIMEOUT_MINUTES
 from core.renderers import MAIN_BUTTON_REPLY_MARKUP
 from core.services.chat import ChatService
 from core.services.db import DBService
+from core.services.eligibility import get_user_eligibility
 from core.services.user import UserService
-from core.services.wallet import WalletService
 from core.settings import Config
 from core.utils.authorization import get_telegram_chat_member
 from core.utils.bot import answer_callback_query, delete_message
@@ -38,14 +37,8 @@ async def join_club_handler(
             )
             return
 
-        wallet_service = WalletService(db_session)
-        is_nft_holder = wallet_service.is_nft_holder(
-            owner_address=user.wallet.address,
-            collection_address=userfriendly_to_raw(
-                Config.TARGET_NFT_COLLECTION_ADDRESS
-            ),
-        )
-        if not user.is_eligible_club_member(is_nft_holder=is_nft_holder):
+        eligibility = await get_user_eligibility(db_session, user)
+        if not eligibility.is_eligible:
             await context.bot.send_message(
                 chat_id=update.effective_chat.id,
                 text="You are not eligible to join the club!",
@@ -3,7 +3,6 @@ import datetime
 import logging
 from io import BytesIO
 
-from pytonapi.utils import userfriendly_to_raw
 import qrcode
 from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram.ext import ContextTypes
@@ -11,11 +10,16 @@ from telegram.ext import ContextTypes
 from core.constants import DEFAULT_CONNECT_TIMEOUT
 from core.renderers import connected_wallet_welcome_renderer, MAIN_BUTTON_REPLY_MARKUP
 from core.services.db import DBService
+from core.services.eligibility import (
+    EligibilityCache,
+    get_user_eligibility,
+    refresh_user_eligibility,
+)
 from core.services.storage import get_connector
 from core.services.user import UserService
 from core.services.wallet import WalletService, UserWalletExistError
-from core.settings import Config
 from core.utils.authorization import (
+    ban_telegram_chat_member,
     demote_user,
     promote_user,
     get_telegram_chat_member,
@@ -38,15 +42,9 @@ async def connect_wallet_handler(
             user_service = UserService(db_session)
             user = user_service.get_or_create(telegram_user=update.effective_user)
             if user.wallet:
-                wallet_service = WalletService(db_session)
-                is_nft_holder = wallet_service.is_nft_holder(
-                    owner_address=user.wallet.address,
-                    collection_address=userfriendly_to_raw(
-                        Config.TARGET_NFT_COLLECTION_ADDRESS
-                    ),
-                )
+                eligibility = await get_user_eligibility(db_session, user)
                 await connected_wallet_welcome_renderer(
-                    update, context, user, is_nft_holder
+                    update, context, user, eligibility
                 )
                 await delete_message(
                     context=context,
@@ -175,17 +173,12 @@ async def connect_wallet_handler(
                     user = user_service.get_or_create(
                         telegram_user=update.effective_user
                     )
-                    is_nft_holder = wallet_service.is_nft_holder(
-                        owner_address=user.wallet.address,
-                        collection_address=userfriendly_to_raw(
-                            Config.TARGET_NFT_COLLECTION_ADDRESS
-                        ),
-                    )
+                    eligibility = await refresh_user_eligibility(db_session, user)
                     return await connected_wallet_welcome_renderer(
                         update,
                         context,
                         user,
-                        is_nft_holder,
+                        eligibility,
                     )
 
     await context.bot.send_message(
@@ -233,11 +226,7 @@ async def disconnect_wallet_handler(
                 "Banning user `%d` from group because of disconnecting wallet",
                 update.effective_user.id,
             )
-            await context.bot.ban_chat_member(
-                chat_id=Config.TARGET_COMMON_CHAT_ID,
-                user_id=update.effective_user.id,
-                until_date=60,  # ban for a minute so that user can join again in a minute
-            )
+            await ban_telegram_chat_member(context, update.effective_user.id)
     else:
         logger.info(
             "Failed to ban user `%d` from group because user is not a chat member",
@@ -248,6 +237,7 @@ async def disconnect_wallet_handler(
         user = user_service.get_or_create(telegram_user=update.effective_user)
         wallet_service = WalletService(db_session)
         wallet_service.disconnect_user_wallet(user_id=user.id)
+        await EligibilityCache().delete(user.telegram_id)
 
         await context.bot.send_message(
             chat_id=update.effective_chat.id,
@@ -0,0 +1,30 @@
+import logging
+
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from core.settings import Config
+from core.utils.admins import admin_registry
+from core.utils.membership import Membership, membership_cache
+
+
+logger = logging.getLogger(__name__)
+
+
+async def chat_member_callback(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+) -> None:
+    if str(update.effective_chat.id) != str(Config.TARGET_COMMON_CHAT_ID):
+        return
+
+    chat_member = update.chat_member.new_chat_member
+    logger.debug(
+        "Chat member `%d` status changed to `%s`",
+        chat_member.user.id,
+        chat_member.status,
+    )
+    admin_registry.update(chat_member)
+    await membership_cache.set(
+        chat_member.user.id, Membership.from_chat_member(chat_member)
+    )
@@ -1,14 +1,13 @@
 import logging
 
-from pytonapi.utils import userfriendly_to_raw
 from telegram import Update
 from telegram.ext import ContextTypes
 
 from core.services.chat import ChatService
 from core.services.db import DBService
+from core.services.eligibility import get_user_eligibility
 from core.services.user import UserService
-from core.services.wallet import WalletService
-from core.settings import Config
+from core.utils.membership import membership_cache
 
 
 logger = logging.Logger(__name__)
@@ -36,14 +35,8 @@ async def chat_join_request_callback(
                 user_id=update.effective_user.id,
             )
 
-        wallet_service = WalletService(db_session)
-        is_nft_holder = wallet_service.is_nft_holder(
-            owner_address=user.wallet.address,
-            collection_address=userfriendly_to_raw(
-                Config.TARGET_NFT_COLLECTION_ADDRESS
-            ),
-        )
-        if not user.is_eligible_club_member(is_nft_holder=is_nft_holder):
+        eligibility = await get_user_eligibility(db_session, user)
+        if not eligibility.is_eligible:
             logger.warning(
                 f"User `{user.telegram_id}` tried to join chat {update.effective_chat.id} without eligibility"
             )
@@ -58,6 +51,8 @@ async def chat_join_request_callback(
             chat_id=update.effective_chat.id,
             user_id=update.effective_user.id,
         )
+        # The `chat_member` update may come later than the next membership check
+        await membership_cache.delete(user.telegram_id)
         chat_service.mark_invite_link_activated(
             invite_link=invite_link_request.invite_link
         )
@@ -0,0 +1,32 @@
+import struct
+
+from pytonapi.utils import userfriendly_to_raw
+from sqlalchemy import BINARY
+from sqlalchemy.types import TypeDecorator
+
+
+class RawAddress(TypeDecorator):
+    """
+    TON address stored as 33 bytes: signed workchain byte and 32-byte hash.
+    Reads and writes the raw `workchain:hex` form, user-friendly addresses
+    are converted on write.
+    """
+
+    impl = BINARY(33)
+    cache_ok = True
+
+    def process_bind_param(self, value: str | None, dialect) -> bytes | None:
+        if value is None:
+            return None
+        if ":" not in value:
+            value = userfriendly_to_raw(value)
+        workchain, account_hash = value.split(":", 1)
+        address_hash = bytes.fromhex(account_hash)
+        if len(address_hash) != 32:
+            raise ValueError(f"Invalid raw address `{value}`")
+        return struct.pack("b", int(workchain)) + address_hash
+
+    def process_result_value(self, value: bytes | None, dialect) -> str | None:
+        if value is None:
+            return None
+        return f"{struct.unpack('b', value[:1])[0]}:{value[1:].hex()}"
@@ -1,11 +1,12 @@
 import datetime
 
 from pytonapi.utils import to_amount
-from sqlalchemy import ForeignKey, String, DateTime, Integer, Index
+from sqlalchemy import Boolean, ForeignKey, DateTime, Integer, Index
 from sqlalchemy.dialects.mysql import BIGINT
 from sqlalchemy.orm import mapped_column, relationship
 
 from core.db import Base
+from core.models.types import RawAddress
 from core.settings import Config
 from core.utils.number import human_friendly_number
 
@@ -14,7 +15,7 @@ class UserWallet(Base):
     __tablename__ = "user_wallet"
 
     user_id = mapped_column(ForeignKey("user.id"), primary_key=True)
-    address = mapped_column(String(255), unique=True, nullable=False)
+    address = mapped_column(RawAddress, unique=True, nullable=False)
     created_at = mapped_column(
         DateTime(timezone=True), default=datetime.datetime.utcnow
     )
@@ -23,16 +24,20 @@ class UserWallet(Base):
         default=datetime.datetime.utcnow,
         onupdate=datetime.datetime.utcnow,
     )
-    jetton_wallet_address = mapped_column(
-        ForeignKey("jetton_wallet.owner_address"), nullable=True
+    # No database foreign key as `jetton_wallet` is replaced by snapshot swaps
+    jetton_wallet_address = mapped_column(RawAddress, nullable=True, index=True)
+    jetton_wallet = relationship(
+        "JettonWallet",
+        primaryjoin="foreign(UserWallet.jetton_wallet_address) == JettonWallet.owner_address",
+        backref="user_wallet",
+        lazy="joined",
     )
-    jetton_wallet = relationship("JettonWallet", backref="user_wallet", lazy="joined")
 
 
 class JettonWallet(Base):
     __tablename__ = "jetton_wallet"
 
-    owner_address = mapped_column(String(255), primary_key=True)
+    owner_address = mapped_column(RawAddress, primary_key=True)
     balance = mapped_column(BIGINT, default=0, nullable=False)
     rating = mapped_column(Integer, default=888888, nullable=False)
     created_at = mapped_column(
@@ -43,12 +48,14 @@ class JettonWallet(Base):
         default=datetime.datetime.utcnow,
         onupdate=datetime.datetime.utcnow,
     )
+    # Computed by holders syncs with `is_whale_holder`
+    is_whale = mapped_column(Boolean, default=False, nullable=False, index=True)
 
-    @property
-    def is_whale(self) -> bool:
+    @staticmethod
+    def is_whale_holder(balance: int, rating: int) -> bool:
         return (
-            self.rating <= Config.WHALE_RATING_THRESHOLD
-            and to_amount(self.balance) >= Config.WHALE_BALANCE_THRESHOLD
+            rating <= Config.WHALE_RATING_THRESHOLD
+            and balance >= Config.WHALE_BALANCE_THRESHOLD_NANO
         )
 
     @property
@@ -60,9 +67,9 @@ class JettonWallet(Base):
 class NftWallet(Base):
     __tablename__ = "nft_wallet"
 
-    item_address = mapped_column(String(255), primary_key=True)
-    owner_address = mapped_column(String(255), nullable=False, index=True)
-    collection_address = mapped_column(String(255), nullable=False)
+    item_address = mapped_column(RawAddress, primary_key=True)
+    owner_address = mapped_column(RawAddress, nullable=False, index=True)
+    collection_address = mapped_column(RawAddress, nullable=False)
     created_at = mapped_column(
         DateTime(timezone=True), default=datetime.datetime.utcnow
     )
@@ -71,11 +78,11 @@ class NftWallet(Base):
         default=datetime.datetime.utcnow,
         onupdate=datetime.datetime.utcnow,
     )
-
     __table_args__ = (
         Index(
             "nft_wallet_owner_address_collection_address",
             "owner_address",
             "collection_address",
         ),
+        Index("nft_wallet_collection_address", "collection_address"),
     )
@@ -24,6 +24,63 @@ from telegram.ext._baseratelimiter import BaseRateLimiter
 
 _LOGGER = get_logger(__name__, class_name="AIORateLimiter")
 
+# Read-only methods whose identical in-flight calls share one request
+COALESCED_METHODS = frozenset(
+    {
+        "getChat",
+        "getChatAdministrators",
+        "getChatMember",
+        "getChatMemberCount",
+        "getMe",
+    }
+)
+
+
+def coalesce_requests(method: Callable):
+    """
+    Identical calls of read-only methods made while one is in flight await
+    that request instead of sending their own. The request runs in its own
+    task, so cancelling one caller doesn't fail the others.
+    """
+
+    @wraps(method)
+    async def inner(
+        self: "NotAIORateLimiter",
+        callback: Callable[
+            ..., Coroutine[Any, Any, Union[bool, JSONDict, List[JSONDict]]]
+        ],
+        args: Any,
+        kwargs: Dict[str, Any],
+        endpoint: str,
+        data: Dict[str, Any],
+        rate_limit_args: Optional[int],
+    ) -> bool | JSONDict | List[JSONDict] | None:
+        request = method(
+            self,
+            callback=callback,
+            args=args,
+            kwargs=kwargs,
+            endpoint=endpoint,
+            data=data,
+            rate_limit_args=rate_limit_args,
+        )
+        if endpoint not in COALESCED_METHODS:
+            return await request
+
+        key = f"{endpoint}{sorted(data.items(), key=lambda item: item[0])}"
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(request)
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            _LOGGER.debug("Joining in-flight request %s", key)
+            request.close()
+
+        return await asyncio.shield(task)
+
+    return inner
+
 
 def deduplicate_response(method: Callable):
     @wraps(method)
@@ -40,7 +97,8 @@ def deduplicate_response(method: Callable):
     ) -> Coroutine | None:
         _command, _kwargs = args
         _key, _value = format_response_cache_key_value(_command, _kwargs)
-        if _key:
+        # Repeated reads are not duplicated user actions, they are coalesced
+        if _key and _command not in COALESCED_METHODS:
             if await check_user_action_cache(_key, _value):
                 _LOGGER.debug("Duplicated requests for chat ID %s. Exit", _key)
                 # Closing the connection to avoid the request being processed
@@ -143,6 +201,7 @@ class NotAIORateLimiter(BaseRateLimiter[int]):
         "_group_time_period",
         "_max_retries",
         "_retry_after_event",
+        "_in_flight",
     )
 
     def __init__(
@@ -184,6 +243,7 @@ class NotAIORateLimiter(BaseRateLimiter[int]):
         self._max_retries: int = max_retries
         self._retry_after_event = asyncio.Event()
         self._retry_after_event.set()
+        self._in_flight: Dict[str, asyncio.Task] = {}
 
     async def initialize(self) -> None:
         """Does nothing."""
@@ -257,6 +317,7 @@ class NotAIORateLimiter(BaseRateLimiter[int]):
                 return await callback(*args, **kwargs)
 
     # mypy doesn't understand that the last run of the for loop raises an exception
+    @coalesce_requests
     @deduplicate_response
     async def process_request(
         self,
@@ -1,15 +1,14 @@
 import logging
 
-from pytonapi.utils import raw_to_userfriendly, userfriendly_to_raw
+from pytonapi.utils import raw_to_userfriendly
 from pytonconnect import TonConnect
 from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram.ext import ContextTypes
 
 from core.models.user import User
 from core.services.db import DBService
+from core.services.eligibility import Eligibility, get_user_eligibility
 from core.services.user import UserService
-from core.services.wallet import WalletService
-from core.settings import Config
 from core.utils.authorization import get_telegram_chat_member
 
 MAIN_BUTTON_REPLY_MARKUP = InlineKeyboardMarkup.from_button(
@@ -24,7 +23,7 @@ async def connected_wallet_welcome_renderer(
     update: Update,
     context: ContextTypes.DEFAULT_TYPE,
     user: User,
-    is_nft_holder: bool = False,
+    eligibility: Eligibility,
 ) -> None:
     keyboard = [
         InlineKeyboardButton(text="Disconnect wallet", callback_data="disconnect")
@@ -32,26 +31,24 @@ async def connected_wallet_welcome_renderer(
     text_lines = [
         f"Connected wallet: {raw_to_userfriendly(user.wallet.address)}\n",
     ]
-    if is_nft_holder:
+    if eligibility.is_nft_holder:
         text_lines.append("🥷 You are Anonymous Number holder!")
     else:
         text_lines.append("🤖 You are not Anonymous Number holder yet!")
 
-    is_anon_holder = user.wallet.jetton_wallet is not None
-    if is_anon_holder:
-        text_lines.append(
-            f"🎱 You are $ANON holder #{user.wallet.jetton_wallet.rating}!"
-        )
+    if eligibility.is_jetton_holder:
+        text_lines.append(f"🎱 You are $ANON holder #{eligibility.rating}!")
 
-        if user.wallet.jetton_wallet.is_whale:
+        if eligibility.is_whale:
             text_lines.append("🐋 You are $ANON whale!")
 
     else:
         text_lines.append("🎱 You are not $ANON holder yet!")
 
-    if await get_telegram_chat_member(
-        context, user.telegram_id
-    ) is None and user.is_eligible_club_member(is_nft_holder=is_nft_holder):
+    if (
+        eligibility.is_eligible
+        and await get_telegram_chat_member(context, user.telegram_id) is None
+    ):
         keyboard.append(
             InlineKeyboardButton(text="Join 8 club 🎱", callback_data="join-club")
         )
@@ -68,15 +65,9 @@ async def start_renderer(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         user_service = UserService(db_session)
         user = user_service.get_or_create(telegram_user=update.effective_user)
         if user.wallet:
-            wallet_service = WalletService(db_session)
-            is_nft_holder = wallet_service.is_nft_holder(
-                owner_address=user.wallet.address,
-                collection_address=userfriendly_to_raw(
-                    Config.TARGET_NFT_COLLECTION_ADDRESS
-                ),
-            )
+            eligibility = await get_user_eligibility(db_session, user)
             return await connected_wallet_welcome_renderer(
-                update, context, user, is_nft_holder
+                update, context, user, eligibility
             )
         else:
             wallets_list = TonConnect.get_wallets()
@@ -1,99 +1,357 @@
 import asyncio
 import logging
-import time
+from typing import AsyncIterator, Awaitable, Callable, NamedTuple, TypeVar
 
-from pytonapi import AsyncTonapi
-from pytonapi.exceptions import TONAPIInternalServerError
-from pytonapi.schema.jettons import JettonHolders, JettonHolder
-from pytonapi.schema.nft import NftItems
+import httpx
+from aiolimiter import AsyncLimiter
+from pytonapi.exceptions import (
+    TONAPIBadRequestError,
+    TONAPIError,
+    TONAPIInternalServerError,
+    TONAPINotFoundError,
+    TONAPINotImplementedError,
+    TONAPITooManyRequestsError,
+    TONAPIUnauthorizedError,
+)
+from pytonapi.schema.jettons import JettonInfo
+from pytonapi.schema.nft import NftCollection
+from pytonapi.utils import userfriendly_to_raw
+from telegram.ext import ContextTypes
 
+from core.constants import (
+    TON_API_BASE_URL,
+    TON_API_MAX_PAGE_RETRIES,
+    TON_API_RETRY_DELAY,
+    TON_API_TIMEOUT,
+)
 from core.settings import Config
 
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+BLOCKCHAIN_SERVICE_KEY = "blockchain_service"
+
+# Shared by all TonAPI calls of the process to stay within the key's quota
+tonapi_limiter = AsyncLimiter(max_rate=Config.TON_API_RPS, time_period=1)
+
+
+TONAPI_ERRORS: dict[int, type[TONAPIError]] = {
+    400: TONAPIBadRequestError,
+    401: TONAPIUnauthorizedError,
+    403: TONAPIInternalServerError,
+    404: TONAPINotFoundError,
+    429: TONAPITooManyRequestsError,
+    500: TONAPIInternalServerError,
+    501: TONAPINotImplementedError,
+}
+
+
+class HolderRecord(NamedTuple):
+    owner_address: str
+    balance: int
+
+
+class NftItemRecord(NamedTuple):
+    address: str
+    owner_address: str | None
+    collection_address: str | None
+
+    def is_owned_in(self, collection_address: str) -> bool:
+        return (
+            self.owner_address is not None
+            and self.collection_address == collection_address
+        )
+
+
+def to_raw_address(address: str) -> str:
+    """
+    Normalize a raw or user-friendly address to the raw form stored in the
+    database.
+    """
+    if ":" not in address:
+        return userfriendly_to_raw(address)
+    workchain, account_hash = address.split(":", 1)
+    return f"{int(workchain)}:{account_hash.lower()}"
+
 
 class BlockchainService:
+    """
+    TonAPI client keeping a single keep-alive connection pool.
+    Create it once per process and close it with :meth:`close` on shutdown.
+    """
+
     def __init__(self):
-        self._tonapi = AsyncTonapi(api_key=Config.TON_API_KEY, max_retries=10)
+        self._client = httpx.AsyncClient(
+            base_url=TON_API_BASE_URL,
+            headers={"Authorization": f"Bearer {Config.TON_API_KEY}"},
+            timeout=TON_API_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=Config.TON_API_CONCURRENCY,
+                max_keepalive_connections=Config.TON_API_CONCURRENCY,
+            ),
+        )
+
+    async def close(self) -> None:
+        await self._client.aclose()
 
-    async def get_all_jetton_holders(self, account_id: str) -> JettonHolders:
+    @staticmethod
+    async def _call(request: Callable[[], Awaitable[T]]) -> T:
+        async with tonapi_limiter:
+            return await request()
+
+    async def _get(self, path: str, params: dict | None = None) -> dict:
         """
-        Get all jettons' holders.
-        Adding some sleep to avoid hitting the rate limit.
+        Make a rate-limited GET request to TonAPI.
+        Retries when TonAPI reports the rate limit is exceeded.
 
-        :param account_id: Account ID
-        :return: :class:`JettonHolders`
+        :param path: API path
+        :param params: query parameters
+        :return: decoded JSON response
         """
-        jetton_holders: list[JettonHolder] = []
-        offset, limit = 0, 1000
-        previous_run_start: float | None = None
-        result: JettonHolders | None = None
+        for attempt in range(1, TON_API_MAX_PAGE_RETRIES + 1):
+            response = await self._call(lambda: self._client.get(path, params=params))
+            if response.status_code == 200:
+                return response.json()
 
-        while True:
+            try:
+                content = response.json()
+                error = content.get("error") or content.get("Error")
+            except ValueError:
+                error = response.text
+
+            error_class = TONAPI_ERRORS.get(response.status_code, TONAPIError)
             if (
-                previous_run_start
-                and (to_wait := (time.time() - previous_run_start)) <= 1
+                error_class is TONAPITooManyRequestsError
+                and attempt < TON_API_MAX_PAGE_RETRIES
             ):
-                await asyncio.sleep(to_wait)
+                logger.warning("TonAPI rate limit exceeded. Retrying %s", path)
+                await asyncio.sleep(TON_API_RETRY_DELAY)
+                continue
+
+            raise error_class(error)
+
+    async def _get_page(self, path: str, offset: int, limit: int) -> dict:
+        return await self._get(path, params={"limit": limit, "offset": offset})
+
+    async def get_jetton_holder_records(
+        self, account_id: str, offset: int, limit: int
+    ) -> list[HolderRecord]:
+        """
+        Get a page of jettons' holders decoded straight from JSON.
+        Addresses are normalized to the raw form.
+
+        :param account_id: Account ID
+        :param offset: offset
+        :param limit: limit
+        :return: list of :class:`HolderRecord`
+        """
+        response = await self._get_page(
+            f"v2/jettons/{account_id}/holders", offset, limit
+        )
+        return [
+            HolderRecord(
+                to_raw_address(holder["owner"]["address"]), int(holder["balance"])
+            )
+            for holder in response["addresses"]
+        ]
+
+    async def get_jetton_info(self, account_id: str) -> JettonInfo:
+        """
+        Get jetton metadata by jetton master address.
+
+        :param account_id: Account ID
+        :return: :class:`JettonInfo`
+        """
+        response = await self._get(f"v2/jettons/{account_id}")
+        return JettonInfo(**response)
+
+    async def _fetch_page(
+        self,
+        fetch: Callable[[int, int], Awaitable[T]],
+        size: Callable[[T], int],
+        offset: int,
+        limit: int,
+        expected_total: int | None,
+    ) -> T:
+        """
+        Fetch a single page, retrying server errors and premature empty pages.
+        Raises :class:`TONAPIError` when the page is still empty after retries.
 
-            previous_run_start = time.time()
+        :param fetch: coroutine function accepting offset and limit
+        :param size: function returning the number of items in a page
+        :param offset: offset
+        :param limit: limit
+        :param expected_total: number of items known to exist, if any
+        :return: page
+        """
+        for attempt in range(1, TON_API_MAX_PAGE_RETRIES + 1):
             try:
-                result = await self._tonapi.jettons.get_holders(
-                    account_id=account_id,
-                    limit=limit,
-                    offset=offset,
-                )
+                result = await fetch(offset, limit)
             except TONAPIInternalServerError:
-                logger.exception("Failed to fetch jetton holders", exc_info=True)
-                previous_run_start = time.time()
+                if attempt == TON_API_MAX_PAGE_RETRIES:
+                    raise
+                logger.warning(
+                    "Failed to fetch page at offset %d. Attempt %d/%d",
+                    offset,
+                    attempt,
+                    TON_API_MAX_PAGE_RETRIES,
+                    exc_info=True,
+                )
+                await asyncio.sleep(TON_API_RETRY_DELAY)
+                continue
+
+            if (
+                size(result) == 0
+                and expected_total is not None
+                and offset < expected_total
+            ):
+                if attempt == TON_API_MAX_PAGE_RETRIES:
+                    # Would otherwise end the iteration as if all items were fetched
+                    raise TONAPIError(
+                        f"Premature empty page at offset {offset}, "
+                        f"{expected_total} items expected"
+                    )
+                logger.warning(
+                    "Returned 0 items at offset %d, but %d are expected",
+                    offset,
+                    expected_total,
+                )
+                await asyncio.sleep(TON_API_RETRY_DELAY)
                 continue
 
-            if len(result.addresses) == 0:
-                break
+            return result
+
+    async def _iter_pages(
+        self,
+        fetch: Callable[[int, int], Awaitable[T]],
+        size: Callable[[T], int],
+        limit: int = 1000,
+        offset: int = 0,
+        expected_total: int | None = None,
+    ) -> AsyncIterator[tuple[int, T]]:
+        """
+        Fetch pages at several offsets concurrently and yield them in offset
+        order until an empty page is returned. TonAPI may return short pages
+        before the end, so they don't stop the iteration.
+
+        :param fetch: coroutine function accepting offset and limit
+        :param size: function returning the number of items in a page
+        :param limit: page size
+        :param offset: offset to start from
+        :param expected_total: number of items known to exist, if any
+        :return: async iterator of (offset, page)
+        """
+        next_offset = offset
+        pending: dict[int, asyncio.Task] = {}
+        try:
+            while True:
+                while len(pending) < Config.TON_API_CONCURRENCY:
+                    pending[next_offset] = asyncio.create_task(
+                        self._fetch_page(
+                            fetch, size, next_offset, limit, expected_total
+                        )
+                    )
+                    next_offset += limit
+
+                page_offset = min(pending)
+                result = await pending.pop(page_offset)
+                if size(result) == 0:
+                    break
 
-            jetton_holders += result.addresses
-            offset += limit
+                yield page_offset, result
+        finally:
+            for task in pending.values():
+                task.cancel()
 
-        return JettonHolders(addresses=jetton_holders, total=result.total)
+    async def iter_jetton_holders(
+        self, account_id: str, limit: int = 1000
+    ) -> AsyncIterator[list[HolderRecord]]:
+        """
+        Iterate over jettons' holders page by page, ordered by balance.
 
-    async def get_nft_items(self, account_id: str, offset: int, limit: int) -> NftItems:
+        :param account_id: Account ID
+        :param limit: page size
+        :return: async iterator of :class:`HolderRecord` pages
         """
-        Get NFT items.
+
+        async def fetch(offset: int, limit: int) -> list[HolderRecord]:
+            return await self.get_jetton_holder_records(account_id, offset, limit)
+
+        async for _, page in self._iter_pages(fetch, len, limit=limit):
+            yield page
+
+    async def get_nft_item_records(
+        self, account_id: str, offset: int, limit: int
+    ) -> list[NftItemRecord]:
+        """
+        Get NFT items of the collection decoded straight from JSON.
+        Addresses are normalized to the raw form.
 
         :param account_id: Account ID
         :param offset: offset
         :param limit: limit
-        :return: list of NFT item addresses
+        :return: list of :class:`NftItemRecord`
         """
-        result = await self._tonapi.nft.get_items_by_collection_address(
-            account_id=account_id,
-            limit=limit,
-            offset=offset,
+        response = await self._get_page(
+            f"v2/nfts/collections/{account_id}/items", offset, limit
         )
+        records = []
+        for item in response["nft_items"]:
+            owner = (item.get("owner") or {}).get("address")
+            collection = (item.get("collection") or {}).get("address")
+            records.append(
+                NftItemRecord(
+                    to_raw_address(item["address"]),
+                    to_raw_address(owner) if owner else None,
+                    to_raw_address(collection) if collection else None,
+                )
+            )
+        return records
+
+    async def get_nft_collection(self, account_id: str) -> NftCollection:
+        """
+        Get NFT collection.
 
-        return result
+        :param account_id: Account ID
+        :return: :class:`NftCollection`
+        """
+        response = await self._get(f"v2/nfts/collections/{account_id}")
+        return NftCollection(**response)
 
-    async def get_all_nft_items(self, account_id: str) -> NftItems:
+    async def iter_nft_items(
+        self,
+        account_id: str,
+        limit: int = 1000,
+        offset: int = 0,
+        expected_total: int | None = None,
+    ) -> AsyncIterator[tuple[int, list[NftItemRecord]]]:
         """
-        Get all NFT items.
+        Iterate over NFT items of the collection page by page.
 
         :param account_id: Account ID
-        :return: list of NFT item addresses
+        :param limit: page size
+        :param offset: offset to start from
+        :param expected_total: number of items known to exist in the collection
+        :return: async iterator of (offset, list of :class:`NftItemRecord`)
         """
-        nft_items = []
-        offset, limit = 0, 1000
 
-        while True:
-            result = await self._tonapi.nft.get_items_by_collection_address(
-                account_id=account_id,
-                limit=limit,
-                offset=offset,
-            )
-            if len(result.items) == 0:
-                break
+        async def fetch(offset: int, limit: int) -> list[NftItemRecord]:
+            return await self.get_nft_item_records(account_id, offset, limit)
+
+        async for offset, page in self._iter_pages(
+            fetch,
+            len,
+            limit=limit,
+            offset=offset,
+            expected_total=expected_total,
+        ):
+            yield offset, page
 
-            nft_items += result.nft_items
-            offset += limit
 
-        return NftItems(nft_items=nft_items, total=result.total)
+def get_blockchain_service(context: ContextTypes.DEFAULT_TYPE) -> BlockchainService:
+    """
+    Get the application-scoped :class:`BlockchainService` created on bot startup.
+    """
+    return context.bot_data[BLOCKCHAIN_SERVICE_KEY]
@@ -0,0 +1,105 @@
+import json
+import logging
+import time
+import uuid
+from collections.abc import Collection
+from dataclasses import asdict, dataclass, field
+
+from core.constants import SYNC_CHECKPOINT_TTL
+from core.utils.cache import redis_client
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SyncCheckpoint:
+    expected_total: int
+    offset: int = 0
+    # Set once the run provably reached the end of the data
+    completed: bool = False
+    run_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    started_at: float = field(default_factory=time.time)
+
+
+class CheckpointService:
+    """
+    Redis storage of the progress of a long-running sync job, with the set
+    of items the run has seen so far.
+    """
+
+    def __init__(self, name: str):
+        self.key = f"checkpoint:{name}"
+        self.items_key = f"{self.key}:items"
+
+    async def get(self) -> SyncCheckpoint | None:
+        value = await redis_client.get(self.key)
+        if not value:
+            return None
+
+        try:
+            return SyncCheckpoint(**json.loads(value))
+        except (TypeError, ValueError):
+            logger.warning("Invalid checkpoint `%s`: %s. Ignoring", self.key, value)
+            return None
+
+    async def save(self, checkpoint: SyncCheckpoint) -> None:
+        await redis_client.setex(
+            self.key, SYNC_CHECKPOINT_TTL, json.dumps(asdict(checkpoint))
+        )
+
+    async def add_items(self, items: Collection[str]) -> None:
+        if not items:
+            return
+
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.sadd(self.items_key, *items)
+            pipe.expire(self.items_key, SYNC_CHECKPOINT_TTL)
+            await pipe.execute()
+
+    async def get_items(self) -> set[str]:
+        return {item.decode() for item in await redis_client.smembers(self.items_key)}
+
+    async def clear(self) -> None:
+        await redis_client.delete(self.key, self.items_key)
+
+
+class CursorService:
+    """Redis storage of a position processed by an incremental job."""
+
+    def __init__(self, name: str):
+        self.key = f"cursor:{name}"
+
+    async def get(self) -> int | None:
+        value = await redis_client.get(self.key)
+        return int(value) if value else None
+
+    async def save(self, value: int) -> None:
+        await redis_client.set(self.key, value)
+
+
+class RecentChecks:
+    """
+    Redis storage of items checked by a rolling job, forgotten after the TTL.
+    """
+
+    def __init__(self, name: str, ttl: int):
+        self.prefix = f"checked:{name}"
+        self.ttl = ttl
+
+    async def filter_unchecked(self, ids: list[int]) -> set[int]:
+        """
+        :param ids: IDs of items
+        :return: IDs of items not checked within the TTL
+        """
+        if not ids:
+            return set()
+
+        values = await redis_client.mget([f"{self.prefix}:{id_}" for id_ in ids])
+        return {id_ for id_, value in zip(ids, values) if not value}
+
+    async def mark(self, ids: list[int]) -> None:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for id_ in ids:
+                pipe.setex(f"{self.prefix}:{id_}", self.ttl, 1)
+            await pipe.execute()
@@ -0,0 +1,248 @@
+import json
+import logging
+from dataclasses import asdict, dataclass
+
+from pytonapi.utils import userfriendly_to_raw
+
+from core.constants import (
+    DB_BULK_CHUNK_SIZE,
+    ELIGIBILITY_KEY,
+    ELIGIBILITY_REBUILD_TTL,
+)
+from core.models.user import User
+from core.models.wallet import JettonWallet, UserWallet
+from core.services.base import BaseService
+from core.services.wallet import WalletService
+from core.settings import Config
+from core.utils.cache import redis_client
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Eligibility:
+    is_nft_holder: bool = False
+    is_whale: bool = False
+    rating: int | None = None
+
+    @property
+    def is_jetton_holder(self) -> bool:
+        return self.rating is not None
+
+    @property
+    def is_eligible(self) -> bool:
+        return self.is_nft_holder or self.is_whale
+
+
+class EligibilityService(BaseService):
+    """Computes club eligibility of users from the synced wallet tables."""
+
+    def compute_all(self) -> dict[int, Eligibility]:
+        """
+        Compute eligibility of every user with a connected wallet.
+
+        :return: :class:`Eligibility` by Telegram ID
+        """
+        holders = WalletService(self.db_session).get_nft_holders(
+            userfriendly_to_raw(Config.TARGET_NFT_COLLECTION_ADDRESS)
+        )
+        rows = (
+            self.db_session.query(
+                User.telegram_id,
+                UserWallet.address,
+                JettonWallet.is_whale,
+                JettonWallet.rating,
+            )
+            .join(UserWallet, UserWallet.user_id == User.id)
+            .outerjoin(
+                JettonWallet,
+                JettonWallet.owner_address == UserWallet.jetton_wallet_address,
+            )
+        )
+        return {
+            telegram_id: Eligibility(
+                is_nft_holder=address in holders,
+                is_whale=bool(is_whale),
+                rating=rating,
+            )
+            for telegram_id, address, is_whale, rating in rows
+        }
+
+    def compute(self, user: User) -> Eligibility:
+        """
+        Compute eligibility of a user loaded with the wallet.
+
+        :param user: :class:`User`
+        :return: :class:`Eligibility`
+        """
+        if not user.wallet:
+            return Eligibility()
+
+        jetton_wallet = user.wallet.jetton_wallet
+        return Eligibility(
+            is_nft_holder=WalletService(self.db_session).is_nft_holder(
+                owner_address=user.wallet.address,
+                collection_address=userfriendly_to_raw(
+                    Config.TARGET_NFT_COLLECTION_ADDRESS
+                ),
+            ),
+            is_whale=bool(jetton_wallet and jetton_wallet.is_whale),
+            rating=jetton_wallet.rating if jetton_wallet else None,
+        )
+
+
+# Writes a user's eligibility, or deletes it when the value is empty, and
+# records it while a rebuild is in progress so it can be replayed over the
+# rebuilt hash.
+# KEYS: hash, rebuild flag, pending writes. ARGV: Telegram ID, value, TTL
+WRITE_SCRIPT = """
+if ARGV[2] == "" then
+    redis.call("HDEL", KEYS[1], ARGV[1])
+else
+    redis.call("HSET", KEYS[1], ARGV[1], ARGV[2])
+end
+if redis.call("EXISTS", KEYS[2]) == 1 then
+    redis.call("HSET", KEYS[3], ARGV[1], ARGV[2])
+    redis.call("EXPIRE", KEYS[3], ARGV[3])
+end
+"""
+
+# Swaps in the rebuilt hash and replays the writes made during the rebuild.
+# KEYS: hash, staging hash, rebuild flag, pending writes
+PUBLISH_SCRIPT = """
+if redis.call("EXISTS", KEYS[2]) == 1 then
+    redis.call("RENAME", KEYS[2], KEYS[1])
+else
+    redis.call("DEL", KEYS[1])
+end
+local pending = redis.call("HGETALL", KEYS[4])
+for i = 1, #pending, 2 do
+    if pending[i + 1] == "" then
+        redis.call("HDEL", KEYS[1], pending[i])
+    else
+        redis.call("HSET", KEYS[1], pending[i], pending[i + 1])
+    end
+end
+redis.call("DEL", KEYS[3], KEYS[4])
+return #pending / 2
+"""
+
+
+class EligibilityCache:
+    """
+    Redis hash of users' eligibility by Telegram ID.
+
+    A full rebuild is started with :meth:`begin_replace` before eligibility
+    is computed and finished with :meth:`replace`. Writes of single users
+    made in between are recorded and applied again over the rebuilt hash,
+    so they are not lost to the older snapshot.
+    """
+
+    def __init__(self, key: str = ELIGIBILITY_KEY):
+        self.key = key
+        self.staging_key = f"{key}:staging"
+        self.rebuild_key = f"{key}:rebuilding"
+        self.pending_key = f"{key}:pending"
+
+    async def get(self, telegram_id: int) -> Eligibility | None:
+        value = await redis_client.hget(self.key, str(telegram_id))
+        if not value:
+            return None
+
+        try:
+            return Eligibility(**json.loads(value))
+        except (TypeError, ValueError):
+            logger.warning("Invalid eligibility of `%d`: %s", telegram_id, value)
+            return None
+
+    async def _write(self, telegram_id: int, value: str) -> None:
+        await redis_client.eval(
+            WRITE_SCRIPT,
+            3,
+            self.key,
+            self.rebuild_key,
+            self.pending_key,
+            str(telegram_id),
+            value,
+            ELIGIBILITY_REBUILD_TTL,
+        )
+
+    async def save(self, telegram_id: int, eligibility: Eligibility) -> None:
+        await self._write(telegram_id, json.dumps(asdict(eligibility)))
+
+    async def delete(self, telegram_id: int) -> None:
+        await self._write(telegram_id, "")
+
+    async def begin_replace(self) -> None:
+        """
+        Start recording writes of single users. Call it before reading the
+        data the new hash is computed from.
+        """
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.delete(self.staging_key, self.pending_key)
+            pipe.setex(self.rebuild_key, ELIGIBILITY_REBUILD_TTL, 1)
+            await pipe.execute()
+
+    async def replace(self, eligibility: dict[int, Eligibility]) -> None:
+        """
+        Replace the whole hash, readers see either the old or the new one.
+        """
+        items = [
+            (str(telegram_id), json.dumps(asdict(value)))
+            for telegram_id, value in eligibility.items()
+        ]
+        for start in range(0, len(items), DB_BULK_CHUNK_SIZE):
+            await redis_client.hset(
+                self.staging_key,
+                mapping=dict(items[start : start + DB_BULK_CHUNK_SIZE]),
+            )
+
+        replayed = await redis_client.eval(
+            PUBLISH_SCRIPT,
+            4,
+            self.key,
+            self.staging_key,
+            self.rebuild_key,
+            self.pending_key,
+        )
+        if replayed:
+            logger.info(
+                "Replayed %d eligibility writes made during the rebuild", replayed
+            )
+
+
+async def get_user_eligibility(db_session, user: User) -> Eligibility:
+    """
+    Get eligibility of the user, computing and caching it on a miss.
+
+    :param db_session: database session
+    :param user: :class:`User` loaded with the wallet
+    :return: :class:`Eligibility`
+    """
+    if not user.wallet:
+        return Eligibility()
+
+    cache = EligibilityCache()
+    eligibility = await cache.get(user.telegram_id)
+    if eligibility is None:
+        eligibility = await refresh_user_eligibility(db_session, user)
+    return eligibility
+
+
+async def refresh_user_eligibility(db_session, user: User) -> Eligibility:
+    """
+    Recompute and cache eligibility of the user, e.g. after a wallet change.
+
+    :param db_session: database session
+    :param user: :class:`User` loaded with the wallet
+    :return: :class:`Eligibility`
+    """
+    cache = EligibilityCache()
+    if not user.wallet:
+        await cache.delete(user.telegram_id)
+        return Eligibility()
+
+    eligibility = EligibilityService(db_session).compute(user)
+    await cache.save(user.telegram_id, eligibility)
+    return eligibility
@@ -0,0 +1,68 @@
+import logging
+
+from core.constants import WHALE_CHANGES_STREAM, WHALE_CHANGES_STREAM_MAXLEN
+from core.utils.cache import redis_client
+
+
+logger = logging.getLogger(__name__)
+
+
+def diff_whale_ranks(
+    previous: dict[str, int], current: dict[str, int]
+) -> dict[str, int | None]:
+    """
+    Get whale wallets whose status or rating changed between two syncs.
+
+    :param previous: whale ratings by owner address before the sync
+    :param current: whale ratings by owner address after the sync
+    :return: new rating by owner address, None for wallets no longer whales
+    """
+    return {
+        address: current.get(address)
+        for address in previous.keys() | current.keys()
+        if previous.get(address) != current.get(address)
+    }
+
+
+class WhaleChangeFeed:
+    """
+    Redis stream of whale status and rating changes, consumed by the admins
+    reconciliation. The position of the consumer is stored next to the stream.
+    """
+
+    def __init__(self, key: str = WHALE_CHANGES_STREAM):
+        self.key = key
+        self.cursor_key = f"{key}:last_id"
+
+    async def publish(self, changes: dict[str, int | None]) -> None:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for address, rating in changes.items():
+                pipe.xadd(
+                    self.key,
+                    {"address": address, "rating": "" if rating is None else rating},
+                    maxlen=WHALE_CHANGES_STREAM_MAXLEN,
+                    approximate=True,
+                )
+            await pipe.execute()
+
+    async def read(self, count: int) -> tuple[str | None, dict[str, int | None]]:
+        """
+        Read changes after the last acknowledged one. Repeated changes of
+        a wallet are collapsed to the latest.
+
+        :param count: maximum number of stream entries
+        :return: ID of the last entry read and new rating by owner address
+        """
+        last_id = await redis_client.get(self.cursor_key)
+        response = await redis_client.xread({self.key: last_id or "0"}, count=count)
+        changes: dict[str, int | None] = {}
+        entry_id = None
+        for _, entries in response:
+            for entry_id, fields in entries:
+                rating = fields[b"rating"]
+                changes[fields[b"address"].decode()] = int(rating) if rating else None
+
+        return entry_id.decode() if entry_id else None, changes
+
+    async def ack(self, entry_id: str) -> None:
+        await redis_client.set(self.cursor_key, entry_id)
@@ -0,0 +1,151 @@
+import datetime
+import logging
+
+from sqlalchemy import Index, MetaData, Table, and_, case, func, select, text
+from sqlalchemy.dialects.mysql import insert
+
+from core.constants import DB_BULK_CHUNK_SIZE
+from core.models.wallet import JettonWallet
+from core.services.base import BaseService
+from core.services.blockchain import HolderRecord
+from core.services.wallet import BulkUpsertStats
+
+
+logger = logging.getLogger(__name__)
+
+
+class JettonSnapshotService(BaseService):
+    """
+    Loads a full jetton holders snapshot into a staging table and publishes it
+    with an atomic `RENAME TABLE`, so readers always see one consistent ranking.
+    Wallets missing from the snapshot are retired together with the old table.
+    Nothing may reference `jetton_wallet` with a foreign key, as it would
+    follow the renamed table (see scripts/migrations/002_binary_addresses.sql).
+
+    Usage::
+
+        snapshot.begin()
+        snapshot.load_page(holders, first_rating=1)
+        ...
+        stats = snapshot.publish()
+    """
+
+    def __init__(self, db_session) -> None:
+        super().__init__(db_session)
+        self.live: Table = JettonWallet.__table__
+        self.staging = self.live.to_metadata(
+            MetaData(), name=f"{self.live.name}_staging"
+        )
+        # Secondary indexes are built after the load
+        self.staging.indexes.clear()
+        self.retired_name = f"{self.live.name}_retired"
+
+    def begin(self) -> None:
+        self.abort()
+        self.staging.create(self.db_session.connection())
+
+    def abort(self) -> None:
+        self.staging.drop(self.db_session.connection(), checkfirst=True)
+
+    def load_page(self, holders: list[HolderRecord], first_rating: int) -> int:
+        """
+        Insert a page of holders into the staging table.
+        Duplicates caused by holders moving between pages keep the best rating.
+
+        :param holders: page of holders ordered by balance
+        :param first_rating: rating of the first holder in the page
+        :return: number of holders in the page
+        """
+        now = datetime.datetime.utcnow()
+        values = [
+            {
+                "owner_address": holder.owner_address,
+                "balance": holder.balance,
+                "rating": rating,
+                "is_whale": JettonWallet.is_whale_holder(holder.balance, rating),
+                "created_at": now,
+                "updated_at": now,
+            }
+            for rating, holder in enumerate(holders, start=first_rating)
+        ]
+        for start in range(0, len(values), DB_BULK_CHUNK_SIZE):
+            self.db_session.execute(
+                insert(self.staging)
+                .prefix_with("IGNORE")
+                .values(values[start : start + DB_BULK_CHUNK_SIZE])
+            )
+        self.db_session.commit()
+        return len(values)
+
+    def _build_indexes(self) -> None:
+        for index in self.live.indexes:
+            Index(
+                index.name,
+                *(self.staging.c[column.name] for column in index.columns),
+                unique=index.unique,
+            ).create(self.db_session.connection())
+
+    def _carry_over(self) -> BulkUpsertStats:
+        """
+        Keep creation and update dates of known wallets and count the changes,
+        including wallets retired by the swap.
+        """
+        staging, live = self.staging, self.live
+        unchanged = and_(
+            staging.c.balance == live.c.balance,
+            staging.c.rating == live.c.rating,
+            staging.c.is_whale == live.c.is_whale,
+        )
+        self.db_session.execute(
+            staging.update()
+            .where(staging.c.owner_address == live.c.owner_address)
+            .values(
+                created_at=live.c.created_at,
+                updated_at=case(
+                    (unchanged, live.c.updated_at), else_=staging.c.updated_at
+                ),
+            )
+        )
+
+        total, inserted, not_changed = self.db_session.execute(
+            select(
+                func.count(),
+                func.count() - func.count(live.c.owner_address),
+                func.coalesce(func.sum(case((unchanged, 1), else_=0)), 0),
+            ).select_from(
+                staging.outerjoin(live, staging.c.owner_address == live.c.owner_address)
+            )
+        ).one()
+        removed = self.db_session.execute(
+            select(func.count())
+            .select_from(
+                live.outerjoin(staging, staging.c.owner_address == live.c.owner_address)
+            )
+            .where(staging.c.owner_address.is_(None))
+        ).scalar_one()
+        return BulkUpsertStats(
+            inserted=inserted,
+            updated=total - inserted - not_changed,
+            unchanged=not_changed,
+            removed=removed,
+        )
+
+    def publish(self) -> BulkUpsertStats:
+        """
+        Swap the staging table with the live one.
+
+        :return: :class:`BulkUpsertStats` relative to the previous snapshot
+        """
+        self._build_indexes()
+        stats = self._carry_over()
+        self.db_session.commit()
+
+        self.db_session.execute(text(f"DROP TABLE IF EXISTS `{self.retired_name}`"))
+        self.db_session.execute(
+            text(
+                f"RENAME TABLE `{self.live.name}` TO `{self.retired_name}`, "
+                f"`{self.staging.name}` TO `{self.live.name}`"
+            )
+        )
+        self.db_session.execute(text(f"DROP TABLE `{self.retired_name}`"))
+        return stats
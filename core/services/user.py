@@ -1,12 +1,17 @@
+from collections.abc import AsyncGenerator
 from typing import Iterable
 
+from sqlalchemy import or_
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.orm import joinedload
 from telegram import User as TelegramUser
 
+from core.constants import USER_CHUNK_SIZE
 from core.models.user import User
 from core.models.wallet import UserWallet
 from core.services.base import BaseService
+from core.services.db import DBService
+from core.utils.executor import run_in_db_executor
 
 
 class UserService(BaseService):
@@ -31,21 +36,71 @@ class UserService(BaseService):
 
         return query.all()
 
-    def get_all_prefetched(
+    def count(self) -> int:
+        return self.db_session.query(User).count()
+
+    def _prefetched_query(
         self,
         telegram_ids: Iterable[int] | None = None,
-    ) -> list[User]:
+        wallet_addresses: Iterable[str] | None = None,
+    ):
         query = self.db_session.query(User)
+        filters = []
         if telegram_ids:
-            query = query.filter(User.telegram_id.in_(telegram_ids))
+            filters.append(User.telegram_id.in_(telegram_ids))
+        if wallet_addresses:
+            filters.append(User.wallet.has(UserWallet.address.in_(wallet_addresses)))
+        if filters:
+            query = query.filter(or_(*filters))
 
-        query = query.options(
+        return query.options(
             joinedload(User.wallet).options(
                 joinedload(UserWallet.jetton_wallet),
             )
         )
 
-        return query.all()
+    def get_all_prefetched(
+        self,
+        telegram_ids: Iterable[int] | None = None,
+        wallet_addresses: Iterable[str] | None = None,
+    ) -> list[User]:
+        """
+        Get users with their wallets loaded. When both filters are given,
+        users matching either of them are returned.
+
+        :param telegram_ids: Telegram IDs of users
+        :param wallet_addresses: connected wallet addresses in raw form
+        """
+        return self._prefetched_query(
+            telegram_ids=telegram_ids, wallet_addresses=wallet_addresses
+        ).all()
+
+    def get_prefetched_page(
+        self,
+        after_id: int,
+        limit: int,
+        telegram_ids: Iterable[int] | None = None,
+        wallet_addresses: Iterable[str] | None = None,
+    ) -> list[User]:
+        """
+        Get the next page of users with their wallets loaded, ordered by ID.
+        Pages are keyed by the last ID instead of an offset, so each one is
+        an index range scan however far the iteration went.
+
+        :param after_id: ID of the last user of the previous page, 0 to start
+        :param limit: maximum number of users
+        :param telegram_ids: Telegram IDs of users
+        :param wallet_addresses: connected wallet addresses in raw form
+        """
+        return (
+            self._prefetched_query(
+                telegram_ids=telegram_ids, wallet_addresses=wallet_addresses
+            )
+            .filter(User.id > after_id)
+            .order_by(User.id)
+            .limit(limit)
+            .all()
+        )
 
     def create(self, telegram_user: TelegramUser) -> User:
         new_user = User(
@@ -82,3 +137,53 @@ class UserService(BaseService):
             return self.get(telegram_user.id)
         except NoResultFound:
             return self.create(telegram_user)
+
+
+def load_prefetched_users(
+    after_id: int,
+    limit: int,
+    telegram_ids: Iterable[int] | None = None,
+    wallet_addresses: Iterable[str] | None = None,
+) -> list[User]:
+    """
+    Load a page of users with their wallets in a short-lived session and
+    detach them from it. Blocking, run it in the DB executor.
+
+    See :meth:`UserService.get_prefetched_page` for the parameters.
+    """
+    with DBService().db_session() as db_session:
+        users = UserService(db_session).get_prefetched_page(
+            after_id=after_id,
+            limit=limit,
+            telegram_ids=telegram_ids,
+            wallet_addresses=wallet_addresses,
+        )
+        # Detach before the commit expires them, the wallets are loaded
+        db_session.expunge_all()
+        return users
+
+
+async def iter_prefetched_users(
+    chunk_size: int = USER_CHUNK_SIZE,
+    telegram_ids: Iterable[int] | None = None,
+    wallet_addresses: Iterable[str] | None = None,
+) -> AsyncGenerator[list[User], None]:
+    """
+    Iterate over users with their wallets loaded in chunks, for background
+    jobs. Each chunk is loaded in its own short-lived session and detached
+    from it, so only the chunk being processed is held in memory.
+
+    :param chunk_size: number of users in a chunk
+    :param telegram_ids: Telegram IDs of users
+    :param wallet_addresses: connected wallet addresses in raw form
+    """
+    after_id = 0
+    while users := await run_in_db_executor(
+        load_prefetched_users,
+        after_id=after_id,
+        limit=chunk_size,
+        telegram_ids=telegram_ids,
+        wallet_addresses=wallet_addresses,
+    ):
+        yield users
+        after_id = users[-1].id
@@ -1,10 +1,15 @@
+import datetime
 import logging
+from collections.abc import Iterable, Set
+from dataclasses import dataclass
 
-from pytonapi.schema.jettons import JettonHolders
-from pytonapi.schema.nft import NftItems
+from sqlalchemy import or_, update
+from sqlalchemy.dialects.mysql import insert
 
+from core.constants import DB_BULK_CHUNK_SIZE
 from core.models.wallet import UserWallet, JettonWallet, NftWallet
 from core.services.base import BaseService
+from core.services.blockchain import NftItemRecord
 
 
 logger = logging.getLogger(__name__)
@@ -14,6 +19,85 @@ class UserWalletExistError(Exception):
     pass
 
 
+@dataclass
+class BulkUpsertStats:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    removed: int = 0
+
+    def __iadd__(self, other: "BulkUpsertStats") -> "BulkUpsertStats":
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+        self.removed += other.removed
+        return self
+
+
+class NftHolderIndex:
+    """
+    Process-wide owner addresses of NFT items by collection, rebuilt after
+    NFT syncs. Each rebuild swaps in a new frozen set, so readers never see
+    a partially built index.
+    """
+
+    def __init__(self) -> None:
+        self._holders: dict[str, frozenset[str]] = {}
+
+    def replace(self, collection_address: str, holders: set[str]) -> None:
+        self._holders = {**self._holders, collection_address: frozenset(holders)}
+
+    def is_warm(self, collection_address: str) -> bool:
+        return collection_address in self._holders
+
+    def get(self, collection_address: str) -> frozenset[str] | None:
+        return self._holders.get(collection_address)
+
+    def is_holder(self, owner_address: str, collection_address: str) -> bool | None:
+        """
+        :return: whether the address holds an item, None if the index is cold
+        """
+        holders = self._holders.get(collection_address)
+        if holders is None:
+            return None
+        return owner_address in holders
+
+
+nft_holder_index = NftHolderIndex()
+
+
+class WhaleRanks:
+    """
+    Process-wide ratings of whale wallets by owner address, replaced as a
+    whole after each jetton holders sync.
+    """
+
+    def __init__(self) -> None:
+        self._ranks: dict[str, int] | None = None
+
+    @property
+    def is_warm(self) -> bool:
+        return self._ranks is not None
+
+    def replace(self, ranks: dict[str, int]) -> None:
+        self._ranks = ranks
+
+    def get(self, owner_address: str) -> int | None:
+        return (self._ranks or {}).get(owner_address)
+
+    def ranks(self) -> dict[str, int] | None:
+        """
+        :return: ratings by owner address, None if the map is cold
+        """
+        return self._ranks
+
+    def addresses(self) -> set[str]:
+        return set(self._ranks or ())
+
+
+whale_ranks = WhaleRanks()
+
+
 class WalletService(BaseService):
     def connect_user_wallet(self, user_id: int, wallet_address: str) -> None:
         existing_user_wallet = self.get_user_wallet(wallet_address)
@@ -72,122 +156,191 @@ class WalletService(BaseService):
             f"User wallet {wallet_address} or jetton wallet {wallet_address} not found"
         )
 
-    def _add_jetton_wallet(
-        self, wallet_address: str, balance: int, rating: int
-    ) -> None:
-        new_wallet = JettonWallet(
-            owner_address=wallet_address, balance=balance, rating=rating
-        )
-        self.db_session.add(new_wallet)
-        logger.debug(f"Added jetton wallet {wallet_address}")
+    def get_whale_ranks(self) -> dict[str, int]:
+        return {
+            owner_address: rating
+            for owner_address, rating in self.db_session.query(
+                JettonWallet.owner_address, JettonWallet.rating
+            ).filter(JettonWallet.is_whale.is_(True))
+        }
 
-    def _update_jetton_wallet(
-        self, wallet_address: str, balance: int, rating: int
-    ) -> None:
-        wallet = (
-            self.db_session.query(JettonWallet)
-            .filter(JettonWallet.owner_address == wallet_address)
-            .one()
-        )
-        if wallet.balance == balance and wallet.rating == rating:
-            logger.debug(f"Jetton wallet {wallet_address} has not changed")
-            return
-        wallet.balance = balance
-        wallet.rating = rating
-        self.db_session.add(wallet)
-        logger.debug(f"Updated jetton wallet {wallet_address}")
+    def refresh_whale_ranks(self) -> int:
+        """
+        Load the in-memory whale ratings from the database.
 
-    def jetton_wallet_exists(self, wallet_address: str) -> bool:
-        return (
-            self.db_session.query(JettonWallet)
-            .filter(JettonWallet.owner_address == wallet_address)
-            .count()
-            > 0
-        )
+        :return: number of whales
+        """
+        ranks = self.get_whale_ranks()
+        whale_ranks.replace(ranks)
+        return len(ranks)
 
-    def get_jetton_wallet(self, wallet_address: str) -> JettonWallet:
-        return (
-            self.db_session.query(JettonWallet)
-            .filter(JettonWallet.owner_address == wallet_address)
-            .one()
-        )
+    def get_user_wallet_addresses(self) -> set[str]:
+        return {address for (address,) in self.db_session.query(UserWallet.address)}
+
+    def link_user_jetton_wallets(self, holder_addresses: set[str]) -> tuple[int, int]:
+        """
+        Link user wallets of the latest snapshot holders to their jetton wallets
+        with a single UPDATE ... JOIN and unlink user wallets that are no
+        longer holders.
+
+        :param holder_addresses: user wallet addresses found in the snapshot
+        :return: number of linked and unlinked user wallets
+        """
+        linked = self.db_session.execute(
+            update(UserWallet)
+            .where(
+                UserWallet.address == JettonWallet.owner_address,
+                UserWallet.address.in_(holder_addresses),
+                or_(
+                    UserWallet.jetton_wallet_address.is_(None),
+                    UserWallet.jetton_wallet_address != UserWallet.address,
+                ),
+            )
+            .values(jetton_wallet_address=JettonWallet.owner_address)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        unlinked = self.db_session.execute(
+            update(UserWallet)
+            .where(
+                UserWallet.jetton_wallet_address.is_not(None),
+                UserWallet.address.not_in(holder_addresses),
+            )
+            .values(jetton_wallet_address=None)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        return linked, unlinked
 
-    def add_or_update_jetton_wallet(
-        self, wallet_address: str, balance: int, rating: int
-    ) -> None:
-        if self.jetton_wallet_exists(wallet_address):
-            self._update_jetton_wallet(wallet_address, balance, rating)
-        else:
-            self._add_jetton_wallet(wallet_address, balance, rating)
+    def _upsert_nft_wallets(self, rows: list[tuple[str, str, str]]) -> BulkUpsertStats:
+        """
+        Write NFT ownerships with a single multi-row upsert. Current owners are
+        read with one `IN` query and unchanged rows are skipped.
 
-        self.db_session.flush()
+        :param rows: list of (item address, owner address, collection address)
+        :return: :class:`BulkUpsertStats`
+        """
+        stats = BulkUpsertStats()
+        if not rows:
+            return stats
 
-    def bulk_update_jetton_holders(self, wallets: JettonHolders) -> None:
-        for rating, wallet in enumerate(wallets.addresses, start=1):
-            self.add_or_update_jetton_wallet(
-                wallet.owner.address.to_raw(), int(wallet.balance), rating
+        existing = {
+            item_address: (owner_address, collection_address)
+            for item_address, owner_address, collection_address in self.db_session.query(
+                NftWallet.item_address,
+                NftWallet.owner_address,
+                NftWallet.collection_address,
+            ).filter(NftWallet.item_address.in_([row[0] for row in rows]))
+        }
+
+        now = datetime.datetime.utcnow()
+        values = []
+        for item_address, owner_address, collection_address in rows:
+            current = existing.get(item_address)
+            if current is None:
+                stats.inserted += 1
+            elif current == (owner_address, collection_address):
+                stats.unchanged += 1
+                continue
+            else:
+                stats.updated += 1
+
+            values.append(
+                {
+                    "item_address": item_address,
+                    "owner_address": owner_address,
+                    "collection_address": collection_address,
+                    "created_at": now,
+                    "updated_at": now,
+                }
             )
-            self.link_user_jetton_wallet(wallet.owner.address.to_raw())
-        self.db_session.commit()
 
-    def _add_nft_wallet(
-        self, item_address: str, owner_address: str, collection_address: str
-    ) -> None:
-        new_wallet = NftWallet(
-            item_address=item_address,
-            owner_address=owner_address,
-            collection_address=collection_address,
-        )
-        self.db_session.add(new_wallet)
-        logger.debug(f"Added NFT wallet {item_address}")
+        if values:
+            stmt = insert(NftWallet).values(values)
+            stmt = stmt.on_duplicate_key_update(
+                owner_address=stmt.inserted.owner_address,
+                collection_address=stmt.inserted.collection_address,
+                updated_at=stmt.inserted.updated_at,
+            )
+            self.db_session.execute(stmt)
 
-    def get_nft_wallet(self, item_address: str) -> NftWallet:
-        return (
-            self.db_session.query(NftWallet)
-            .filter(NftWallet.item_address == item_address)
-            .one()
-        )
+        return stats
 
-    def _update_nft_wallet(
-        self, item_address: str, owner_address: str, collection_address: str
-    ) -> None:
-        wallet = self.get_nft_wallet(item_address)
-        if (
-            wallet.owner_address == owner_address
-            and wallet.collection_address == collection_address
-        ):
-            logger.debug(f"NFT wallet {item_address} has not changed")
-            return
-        wallet.owner_address = owner_address
-        wallet.collection_address = collection_address
-        self.db_session.add(wallet)
-        logger.debug(f"Updated NFT wallet {item_address}")
+    def bulk_update_nft_wallets(
+        self, nft_items: list[NftItemRecord], collection_address: str
+    ) -> BulkUpsertStats:
+        """
+        Save a page of NFT items, writing only new or changed ownerships.
+        Items without an owner or of another collection are skipped.
 
-    def nft_wallet_exists(self, item_address: str) -> bool:
-        return (
-            self.db_session.query(NftWallet)
-            .filter(NftWallet.item_address == item_address)
-            .count()
-            > 0
+        :param nft_items: page of :class:`NftItemRecord`
+        :param collection_address: collection address in raw form
+        :return: :class:`BulkUpsertStats`
+        """
+        stats = self._upsert_nft_wallets(
+            [item for item in nft_items if item.is_owned_in(collection_address)]
         )
+        self.db_session.commit()
+        return stats
 
-    def bulk_update_nft_wallets(self, nft_items: NftItems) -> None:
-        for item in nft_items.nft_items:
-            if not self.nft_wallet_exists(item.address.to_raw()):
-                self._add_nft_wallet(
-                    item_address=item.address.to_raw(),
-                    owner_address=item.owner.address.to_raw(),
-                    collection_address=item.collection.address.to_raw(),
-                )
-            else:
-                self._update_nft_wallet(
-                    item_address=item.address.to_raw(),
-                    owner_address=item.owner.address.to_raw(),
-                    collection_address=item.collection.address.to_raw(),
-                )
+    def retire_stale_nft_wallets(
+        self, collection_address: str, seen_addresses: Set[str]
+    ) -> int:
+        """
+        Delete NFT items of the collection missing from a complete sync.
+
+        :param collection_address: collection address in raw form
+        :param seen_addresses: addresses of items found with an owner
+        :return: number of deleted items
+        """
+        stale = [
+            item_address
+            for (item_address,) in self.db_session.query(NftWallet.item_address).filter(
+                NftWallet.collection_address == collection_address
+            )
+            if item_address not in seen_addresses
+        ]
+        for start in range(0, len(stale), DB_BULK_CHUNK_SIZE):
+            self.db_session.query(NftWallet).filter(
+                NftWallet.item_address.in_(stale[start : start + DB_BULK_CHUNK_SIZE])
+            ).delete(synchronize_session=False)
         self.db_session.commit()
+        return len(stale)
+
+    def get_nft_holder_addresses(self, collection_address: str) -> set[str]:
+        return {
+            owner_address
+            for (owner_address,) in self.db_session.query(NftWallet.owner_address)
+            .filter(NftWallet.collection_address == collection_address)
+            .distinct()
+        }
+
+    def get_nft_holders(self, collection_address: str) -> Set[str]:
+        """
+        Get owner addresses of the collection items, from the in-memory index
+        when it is warm.
+
+        :param collection_address: collection address in raw form
+        """
+        holders = nft_holder_index.get(collection_address)
+        if holders is None:
+            holders = self.get_nft_holder_addresses(collection_address)
+        return holders
+
+    def refresh_nft_holder_index(self, collection_address: str) -> int:
+        """
+        Rebuild the in-memory holders index of the collection.
+
+        :param collection_address: collection address in raw form
+        :return: number of holders
+        """
+        holders = self.get_nft_holder_addresses(collection_address)
+        nft_holder_index.replace(collection_address, holders)
+        return len(holders)
 
     def is_nft_holder(self, owner_address: str, collection_address: str) -> bool:
+        is_holder = nft_holder_index.is_holder(owner_address, collection_address)
+        if is_holder is not None:
+            return is_holder
+
         return (
             self.db_session.query(NftWallet)
             .filter(
@@ -197,3 +350,32 @@ class WalletService(BaseService):
             .count()
             > 0
         )
+
+    def holders_among(
+        self, owner_addresses: Iterable[str], collection_address: str
+    ) -> set[str]:
+        """
+        Get which of the addresses hold an item of the collection, with one
+        query for the whole batch when the in-memory index is cold.
+
+        :param owner_addresses: owner addresses in raw form
+        :param collection_address: collection address in raw form
+        :return: addresses holding at least one item
+        """
+        owner_addresses = set(owner_addresses)
+        if not owner_addresses:
+            return set()
+
+        holders = nft_holder_index.get(collection_address)
+        if holders is not None:
+            return owner_addresses & holders
+
+        return {
+            owner_address
+            for (owner_address,) in self.db_session.query(NftWallet.owner_address)
+            .filter(
+                NftWallet.owner_address.in_(owner_addresses),
+                NftWallet.collection_address == collection_address,
+            )
+            .distinct()
+        }
@@ -47,12 +47,29 @@ class Config:
         os.getenv("DEFAULT_QUEUE_BATCH_PROCESS_LIMIT") or 60
     )
     CONCURRENT_UPDATES = int(os.getenv("CONCURRENT_UPDATES") or 256)
+    DB_JOB_WORKERS = int(os.getenv("DB_JOB_WORKERS") or 4)
+    TELEGRAM_JOB_CONCURRENCY = int(os.getenv("TELEGRAM_JOB_CONCURRENCY") or 8)
 
     TON_API_KEY = os.getenv("TON_API_KEY")
+    TON_API_RPS = float(os.getenv("TON_API_RPS") or 1)
+    TON_API_CONCURRENCY = int(os.getenv("TON_API_CONCURRENCY") or 4)
     TARGET_JETTON_MASTER = os.getenv("TARGET_JETTON_MASTER")
+    JETTON_SYNC_MIN_INTERVAL = int(os.getenv("JETTON_SYNC_MIN_INTERVAL") or 5 * 60)
+    JETTON_SYNC_MAX_INTERVAL = int(os.getenv("JETTON_SYNC_MAX_INTERVAL") or 60 * 60)
     TARGET_NFT_COLLECTION_ADDRESS = os.getenv("TARGET_NFT_COLLECTION_ADDRESS")
+    NFT_OWNERS_SYNC_INTERVAL = int(os.getenv("NFT_OWNERS_SYNC_INTERVAL") or 60 * 60)
     WHALE_RATING_THRESHOLD = int(os.getenv("WHALE_RATING_THRESHOLD") or 90)
     WHALE_BALANCE_THRESHOLD = int(os.getenv("WHALE_BALANCE_THRESHOLD") or 1_000_000)
+    WHALE_BALANCE_THRESHOLD_NANO = WHALE_BALANCE_THRESHOLD * 10**9
+    ADMINS_SWEEP_INTERVAL = int(os.getenv("ADMINS_SWEEP_INTERVAL") or 6 * 60 * 60)
+    ADMINS_CACHE_TTL = int(os.getenv("ADMINS_CACHE_TTL") or 10 * 60)
+    MEMBERSHIP_CACHE_TTL = int(os.getenv("MEMBERSHIP_CACHE_TTL") or 60 * 60)
+    CHAT_MEMBERS_SWEEP_INTERVAL = int(os.getenv("CHAT_MEMBERS_SWEEP_INTERVAL") or 60)
+    CHAT_MEMBERS_SWEEP_MIN_SLICE = int(os.getenv("CHAT_MEMBERS_SWEEP_MIN_SLICE") or 100)
+    CHAT_MEMBERS_SWEEP_BUDGET = int(os.getenv("CHAT_MEMBERS_SWEEP_BUDGET") or 30)
+    CHAT_MEMBERS_SWEEP_PERIOD = int(
+        os.getenv("CHAT_MEMBERS_SWEEP_PERIOD") or 24 * 60 * 60
+    )
 
     TC_MANIFEST_URL = os.getenv(
         "TC_MANIFEST_URL",
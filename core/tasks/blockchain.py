@@ -1,18 +1,58 @@
 import asyncio
 import logging
+import math
 import time
+from collections.abc import Iterator
+from dataclasses import dataclass
 
-from pytonapi.exceptions import TONAPIInternalServerError
+from pytonapi.exceptions import TONAPIError
 from pytonapi.utils import userfriendly_to_raw
-from telegram.error import TelegramError
+from telegram import ChatMember
 from telegram.ext import ContextTypes
 
-from core.services.blockchain import BlockchainService
-from core.services.user import UserService
+from core.constants import (
+    CHAT_MEMBERS_SWEEP_CURSOR,
+    JETTON_HOLDERS_MIN_COVERAGE,
+    NFT_OWNERS_CHECKPOINT,
+    NFT_OWNERS_MIN_COVERAGE,
+    WHALE_CHANGES_BATCH_SIZE,
+)
+from core.models.user import User
+from core.models.wallet import JettonWallet
+from core.services.blockchain import (
+    BlockchainService,
+    NftItemRecord,
+    get_blockchain_service,
+)
+from core.services.checkpoint import (
+    CheckpointService,
+    CursorService,
+    RecentChecks,
+    SyncCheckpoint,
+)
+from core.services.user import (
+    UserService,
+    iter_prefetched_users,
+    load_prefetched_users,
+)
 from core.settings import Config
 from core.services.db import DBService
-from core.services.wallet import WalletService
+from core.services.eligibility import (
+    Eligibility,
+    EligibilityCache,
+    EligibilityService,
+)
+from core.services.feed import WhaleChangeFeed, diff_whale_ranks
+from core.services.snapshot import JettonSnapshotService
+from core.services.wallet import (
+    BulkUpsertStats,
+    WalletService,
+    whale_ranks,
+)
+from core.utils.executor import background_job, run_in_db_executor
+from core.utils.pool import PoolReport, run_pool
 from core.utils.authorization import (
+    ban_telegram_chat_member,
     get_telegram_chat_admins,
     promote_user,
     demote_user,
@@ -23,166 +63,501 @@ from core.utils.authorization import (
 logger = logging.getLogger(__name__)
 
 
-async def fetch_jetton_holders(context: ContextTypes.DEFAULT_TYPE) -> None:
-    try:
-        logger.info("Fetching jetton holders")
-        # Fetch jetton holders from the blockchain
-        holders = await BlockchainService().get_all_jetton_holders(
-            Config.TARGET_JETTON_MASTER
-        )
-        logger.info(f"Found {holders.total} holders")
-        with DBService().db_session() as db_session:
-            wallet_service = WalletService(db_session)
-            wallet_service.bulk_update_jetton_holders(holders)
-        logger.info("Jetton holders fetched and saved. Found %s holders", holders.total)
-        context.application.job_queue.run_once(sanity_admins_check, 0)
-    except Exception:
-        logger.exception("Failed to fetch jetton holders")
-        raise  # Reraise the exception to logs
+jetton_sync_lock = asyncio.Lock()
+# Rebuilds share the staging hash of the cache, so they run one at a time
+eligibility_refresh_lock = asyncio.Lock()
 
 
-async def fetch_nft_owners(context: ContextTypes.DEFAULT_TYPE) -> None:
+@dataclass
+class JettonSyncState:
+    fingerprint: int | None = None
+    last_sync: float | None = None
+
+
+async def watch_jetton_holders(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Start a jetton holders sync when the jetton changed on chain, but not more
+    often than `JETTON_SYNC_MIN_INTERVAL` and at least every `JETTON_SYNC_MAX_INTERVAL`.
+    """
+    state: JettonSyncState = context.job.data
+    if jetton_sync_lock.locked():
+        return
+
+    elapsed = (
+        time.monotonic() - state.last_sync if state.last_sync is not None else None
+    )
+    if elapsed is not None and elapsed < Config.JETTON_SYNC_MIN_INTERVAL:
+        return
+
     try:
-        logger.info("Fetching NFT owners")
-        # Fetch NFT owners from the blockchain
+        fingerprint = await _jetton_holders_fingerprint(get_blockchain_service(context))
+    except TONAPIError:
+        logger.warning("Failed to poll jetton changes", exc_info=True)
+        fingerprint = None
+
+    changed = fingerprint is not None and fingerprint != state.fingerprint
+    if (
+        not changed
+        and elapsed is not None
+        and elapsed < Config.JETTON_SYNC_MAX_INTERVAL
+    ):
+        return
+
+    logger.info(
+        "Scheduling jetton holders sync: %s",
+        "jetton changed" if changed else "maximum interval reached",
+    )
+    state.fingerprint = fingerprint
+    state.last_sync = time.monotonic()
+    context.application.job_queue.run_once(fetch_jetton_holders, 0, data=state)
 
-        offset, limit = 0, 1000
-        batch_count = 1
-        previous_run_start: float | None = None
 
-        while True:
-            if (
-                previous_run_start
-                and (to_wait := (time.time() - previous_run_start)) <= 2
-            ):
-                await asyncio.sleep(to_wait)
+async def _jetton_holders_fingerprint(blockchain_service: BlockchainService) -> int:
+    # Transfers don't touch the jetton master, so the top holders are polled as well
+    info = await blockchain_service.get_jetton_info(Config.TARGET_JETTON_MASTER)
+    top = await blockchain_service.get_jetton_holder_records(
+        Config.TARGET_JETTON_MASTER, offset=0, limit=Config.WHALE_RATING_THRESHOLD
+    )
+    return hash((info.holders_count, info.total_supply, tuple(top)))
+
+
+@background_job
+async def fetch_jetton_holders(context: ContextTypes.DEFAULT_TYPE) -> None:
+    if jetton_sync_lock.locked():
+        logger.info("Jetton holders sync is already running. Skipping")
+        return
 
-            previous_run_start = time.time()
+    async with jetton_sync_lock:
+        try:
+            await _sync_jetton_holders(context)
+        except Exception:
+            if isinstance(context.job.data, JettonSyncState):
+                # Retry on the next poll after the minimum interval
+                context.job.data.fingerprint = None
+            raise
 
+
+async def _sync_jetton_holders(context: ContextTypes.DEFAULT_TYPE) -> None:
+    logger.info("Fetching jetton holders")
+    blockchain_service = get_blockchain_service(context)
+    info = await blockchain_service.get_jetton_info(Config.TARGET_JETTON_MASTER)
+    total = 0
+    with DBService().db_session() as db_session:
+        snapshot = JettonSnapshotService(db_session)
+        wallet_service = WalletService(db_session)
+        user_addresses = await run_in_db_executor(
+            wallet_service.get_user_wallet_addresses
+        )
+        user_holder_addresses: set[str] = set()
+        ranks: dict[str, int] = {}
+        previous_ranks = whale_ranks.ranks()
+        if previous_ranks is None:
+            previous_ranks = await run_in_db_executor(wallet_service.get_whale_ranks)
+        await run_in_db_executor(snapshot.begin)
+        try:
+            # Load the current page while the next one is being fetched
+            pending: asyncio.Future[int] | None = None
             try:
-                batch = await BlockchainService().get_nft_items(
-                    Config.TARGET_NFT_COLLECTION_ADDRESS, offset, limit
-                )
-            except TONAPIInternalServerError:
-                logger.exception("Failed to fetch NFT items", exc_info=True)
-                previous_run_start = time.time()
-                continue
-
-            if len(batch.nft_items) == 0:
-                # Total number of items in the collection
-                if offset < 136_000:
-                    previous_run_start = time.time()
-                    logger.warning(
-                        "Returned 0 owners, but only %d fetched so far", offset
+                async for page in blockchain_service.iter_jetton_holders(
+                    Config.TARGET_JETTON_MASTER
+                ):
+                    if pending:
+                        await pending
+                    pending = asyncio.ensure_future(
+                        run_in_db_executor(snapshot.load_page, page, total + 1)
                     )
-                    continue
+                    for rating, holder in enumerate(page, start=total + 1):
+                        if rating > Config.WHALE_RATING_THRESHOLD:
+                            break
+                        if JettonWallet.is_whale_holder(holder.balance, rating):
+                            # Keep the best rating like the snapshot does
+                            ranks.setdefault(holder.owner_address, rating)
+                    total += len(page)
+                    user_holder_addresses.update(
+                        user_addresses.intersection(
+                            holder.owner_address for holder in page
+                        )
+                    )
+            finally:
+                if pending:
+                    await pending
+
+            # An empty snapshot is rather an API failure than no holders at all
+            if not total:
+                raise RuntimeError("Jetton holders snapshot is empty")
+            # Publishing a cut off scan would drop every holder after the cut
+            if total < info.holders_count * JETTON_HOLDERS_MIN_COVERAGE:
+                raise RuntimeError(
+                    f"Jetton holders snapshot is incomplete: {total} holders "
+                    f"fetched, {info.holders_count} expected"
+                )
+
+            stats = await run_in_db_executor(snapshot.publish)
+        except Exception:
+            await run_in_db_executor(snapshot.abort)
+            raise
+        whale_ranks.replace(ranks)
+        changes = diff_whale_ranks(previous_ranks, ranks)
+        await WhaleChangeFeed().publish(changes)
+
+        linked, unlinked = await run_in_db_executor(
+            wallet_service.link_user_jetton_wallets, user_holder_addresses
+        )
+    logger.info(
+        "Jetton holders fetched and saved. Found %s holders: "
+        "%d inserted, %d updated, %d unchanged, %d removed, "
+        "%d whales with %d changes. %d user wallets linked, %d unlinked",
+        total,
+        stats.inserted,
+        stats.updated,
+        stats.unchanged,
+        stats.removed,
+        len(ranks),
+        len(changes),
+        linked,
+        unlinked,
+    )
+    await refresh_eligibility()
+    context.application.job_queue.run_once(reconcile_whale_changes, 0)
 
-                break
 
+@background_job
+async def fetch_nft_owners(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Sweep owners of the collection items, writing only changed items.
+    TonAPI has no transfer history for a whole collection, so there is no
+    delta source and ownership changes are picked up by this hourly sweep.
+    """
+    blockchain_service = get_blockchain_service(context)
+    checkpoints = CheckpointService(NFT_OWNERS_CHECKPOINT)
+    checkpoint = await checkpoints.get()
+    if checkpoint:
+        logger.info(
+            "Resuming NFT owners sync `%s` from offset %d of %d",
+            checkpoint.run_id,
+            checkpoint.offset,
+            checkpoint.expected_total,
+        )
+    else:
+        collection = await blockchain_service.get_nft_collection(
+            Config.TARGET_NFT_COLLECTION_ADDRESS
+        )
+        # Drop items seen by a run whose checkpoint expired
+        await checkpoints.clear()
+        checkpoint = SyncCheckpoint(expected_total=collection.next_item_index)
+        await checkpoints.save(checkpoint)
+        logger.info(
+            "Fetching NFT owners. Run `%s`, %d items expected",
+            checkpoint.run_id,
+            checkpoint.expected_total,
+        )
+
+    stats = BulkUpsertStats()
+    # Write the current page while the next ones are being fetched
+    pending: asyncio.Future[BulkUpsertStats] | None = None
+    try:
+        async for offset, batch in blockchain_service.iter_nft_items(
+            Config.TARGET_NFT_COLLECTION_ADDRESS,
+            offset=checkpoint.offset,
+            expected_total=checkpoint.expected_total,
+        ):
             logger.info(
                 "Processing batch of %d NFT items. Processed so far: %d",
-                len(batch.nft_items),
+                len(batch),
                 offset,
             )
+            if pending:
+                stats += await pending
+            pending = asyncio.ensure_future(
+                _save_nft_items(
+                    batch,
+                    checkpoints,
+                    checkpoint,
+                    next_offset=offset + len(batch),
+                )
+            )
+    finally:
+        if pending:
+            stats += await pending
+
+    # Items missing from the run are only retired when it provably saw the
+    # whole collection. `next_item_index` also counts burned items.
+    seen_items = await checkpoints.get_items()
+    checkpoint.completed = bool(seen_items) and (
+        checkpoint.offset >= checkpoint.expected_total
+        or len(seen_items) >= checkpoint.expected_total * NFT_OWNERS_MIN_COVERAGE
+    )
+    if checkpoint.completed:
+        await checkpoints.save(checkpoint)
+        stats.removed = await run_in_db_executor(_retire_stale_nft_items, seen_items)
+    else:
+        logger.warning(
+            "NFT owners sync `%s` stopped at offset %d of %d with %d items seen. "
+            "Keeping stale items",
+            checkpoint.run_id,
+            checkpoint.offset,
+            checkpoint.expected_total,
+            len(seen_items),
+        )
+
+    await checkpoints.clear()
+    holders = await run_in_db_executor(_refresh_nft_holder_index)
+    await refresh_eligibility()
+    logger.info(
+        "NFT owners fetched and saved. Run `%s` found %s items: "
+        "%d ownerships changed, %d new items, %d unchanged, %d removed. "
+        "%d holders indexed",
+        checkpoint.run_id,
+        checkpoint.offset,
+        stats.updated,
+        stats.inserted,
+        stats.unchanged,
+        stats.removed,
+        holders,
+    )
+
+
+async def _save_nft_items(
+    batch: list[NftItemRecord],
+    checkpoints: CheckpointService,
+    checkpoint: SyncCheckpoint,
+    next_offset: int,
+) -> BulkUpsertStats:
+    collection_address = userfriendly_to_raw(Config.TARGET_NFT_COLLECTION_ADDRESS)
+
+    def save() -> BulkUpsertStats:
+        with DBService().db_session() as db_session:
+            return WalletService(db_session).bulk_update_nft_wallets(
+                batch, collection_address
+            )
+
+    stats = await run_in_db_executor(save)
+    # Recorded before the offset moves on, so a resumed run knows them too
+    await checkpoints.add_items(
+        [item.address for item in batch if item.is_owned_in(collection_address)]
+    )
+    checkpoint.offset = next_offset
+    await checkpoints.save(checkpoint)
+    return stats
+
+
+def _retire_stale_nft_items(seen_items: set[str]) -> int:
+    with DBService().db_session() as db_session:
+        return WalletService(db_session).retire_stale_nft_wallets(
+            userfriendly_to_raw(Config.TARGET_NFT_COLLECTION_ADDRESS), seen_items
+        )
+
+
+def _telegram_id(user: User) -> int:
+    return user.telegram_id
+
+
+def _count_users() -> int:
+    with DBService().db_session() as db_session:
+        return UserService(db_session).count()
+
+
+def _sweep_slice_size(user_count: int) -> int:
+    # Enough users per tick to cover all of them within the sweep period
+    ticks = max(
+        Config.CHAT_MEMBERS_SWEEP_PERIOD // Config.CHAT_MEMBERS_SWEEP_INTERVAL, 1
+    )
+    return max(math.ceil(user_count / ticks), Config.CHAT_MEMBERS_SWEEP_MIN_SLICE)
+
+
+def _holders_among(owner_addresses: list[str], collection_address: str) -> set[str]:
+    with DBService().db_session() as db_session:
+        return WalletService(db_session).holders_among(
+            owner_addresses=owner_addresses, collection_address=collection_address
+        )
 
-            with DBService().db_session() as db_session:
-                wallet_service = WalletService(db_session)
-                wallet_service.bulk_update_nft_wallets(batch)
 
-            offset += len(batch.nft_items)
-            batch_count += 1
+def _refresh_nft_holder_index() -> int:
+    with DBService().db_session() as db_session:
+        return WalletService(db_session).refresh_nft_holder_index(
+            userfriendly_to_raw(Config.TARGET_NFT_COLLECTION_ADDRESS)
+        )
+
+
+async def refresh_eligibility() -> None:
+    """
+    Recompute eligibility of all users after the wallet tables changed.
+    """
+
+    def compute() -> dict[int, Eligibility]:
+        with DBService().db_session() as db_session:
+            return EligibilityService(db_session).compute_all()
+
+    cache = EligibilityCache()
+    async with eligibility_refresh_lock:
+        await cache.begin_replace()
+        eligibility = await run_in_db_executor(compute)
+        await cache.replace(eligibility)
+    logger.info("Eligibility of %d users refreshed", len(eligibility))
 
-        logger.info("NFT owners fetched and saved. Found %s items", offset)
-    except Exception:
-        logger.exception("Failed to fetch NFT owners")
-        raise  # Reraise the exception to logs
 
+@background_job
+async def reconcile_whale_changes(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Promote, demote or retitle only users whose whale status or rating changed.
+    `sanity_admins_check` remains the periodic full reconciliation.
+    """
+    feed = WhaleChangeFeed()
 
+    async def reconcile(user: User) -> None:
+        if user.wallet.jetton_wallet and user.wallet.jetton_wallet.is_whale:
+            # Also updates the title of whales with a new rating
+            await promote_user(context, user=user)
+        else:
+            await demote_user(context, telegram_id=user.telegram_id)
+
+    while True:
+        last_id, changes = await feed.read(count=WHALE_CHANGES_BATCH_SIZE)
+        if last_id is None:
+            return
+
+        logger.info("Reconciling %d whale changes", len(changes))
+        report = PoolReport()
+        # No filter would load every user
+        if changes:
+            # Detached users, so that no transaction holds `jetton_wallet`
+            # while the Bot API is called
+            async for users in iter_prefetched_users(wallet_addresses=changes.keys()):
+                report += await run_pool(users, reconcile, key=_telegram_id)
+        report.log("reconcile_whale_changes")
+        await feed.ack(last_id)
+
+
+@background_job
 async def sanity_admins_check(context: ContextTypes.DEFAULT_TYPE) -> None:
     admins = await get_telegram_chat_admins(context)
-    admin_ids = [admin.user.id for admin in admins]
+    admin_ids = admins.keys()
     logger.info("Checking sanity of admins")
-    with DBService().db_session() as db_session:
-        user_service = UserService(db_session)
-        users = user_service.get_all_prefetched()
-        for user in users:
-            try:
-                # Promote user if they are a whale and not an admin
-                if user.wallet and user.wallet.jetton_wallet:
-                    if user.wallet.jetton_wallet.is_whale:
-                        await promote_user(context, user=user)
-                        continue
-                # Demote user if they are an admin and not a whale
-                if user.telegram_id in admin_ids:
-                    await demote_user(context, telegram_id=user.telegram_id)
-            except TelegramError:
-                logger.exception(
-                    "Failed to promote/demote user `%d`",
-                    user.telegram_id,
-                    exc_info=True,
-                )
+    if not whale_ranks.is_warm:
+        with DBService().db_session() as db_session:
+            await run_in_db_executor(WalletService(db_session).refresh_whale_ranks)
+
+    async def check(user: User) -> None:
+        # Promote user if they are a whale and not an admin
+        if user.wallet and user.wallet.jetton_wallet:
+            if user.wallet.jetton_wallet.is_whale:
+                await promote_user(context, user=user)
+                return
+        # Demote user if they are an admin and not a whale
+        if user.telegram_id in admin_ids:
+            await demote_user(context, telegram_id=user.telegram_id)
+
+    report = PoolReport()
+    # Only whales and current admins may need promotion or demotion
+    async for users in iter_prefetched_users(
+        telegram_ids=admin_ids, wallet_addresses=whale_ranks.addresses()
+    ):
+        report += await run_pool(users, check, key=_telegram_id)
+    report.log("sanity_admins_check")
     logger.info("Sanity of admins checked")
 
 
+@background_job
 async def sanity_chat_members_check(context: ContextTypes.DEFAULT_TYPE) -> None:
-    logger.info("Checking sanity of chat members")
-    with DBService().db_session() as db_session:
-        user_service = UserService(db_session)
-        users = user_service.get_all_prefetched()
-        wallet_service = WalletService(db_session)
-        for user in users:
-            chat_member = await get_telegram_chat_member(context, user.telegram_id)
-
-            if not user.wallet:
-                if chat_member and chat_member.status != chat_member.BANNED:
-                    if is_telegram_chat_admin(chat_member):
-                        logger.warning(
-                            "User `%d` has no wallet connected, but is an admin. Skipping",
-                            user.telegram_id,
-                        )
-                        continue
-
-                    logger.info("Removing user `%d` from the chat", user.telegram_id)
-                    await context.bot.ban_chat_member(
-                        chat_id=Config.TARGET_COMMON_CHAT_ID,
-                        user_id=user.telegram_id,
-                        until_date=60,  # ban for a minute so that user can join again in a minute
-                    )
-                else:
-                    logger.debug(
-                        "User `%d` has no wallet connected. Skipping", user.telegram_id
-                    )
-                continue
+    """
+    Rolling sweep of chat members: each tick checks the next slice of users
+    after the stored cursor, within a time budget. The slice is sized so that
+    all users are covered within `CHAT_MEMBERS_SWEEP_PERIOD`, and users
+    checked within the period are skipped.
+    """
+    deadline = time.monotonic() + Config.CHAT_MEMBERS_SWEEP_BUDGET
+    cursor = CursorService(CHAT_MEMBERS_SWEEP_CURSOR)
+    recent_checks = RecentChecks(
+        CHAT_MEMBERS_SWEEP_CURSOR, ttl=Config.CHAT_MEMBERS_SWEEP_PERIOD
+    )
+    collection_address = userfriendly_to_raw(Config.TARGET_NFT_COLLECTION_ADDRESS)
 
-            if not chat_member:
-                logger.debug(
-                    "User `%d` is not a chat member. Skipping", user.telegram_id
-                )
-                continue
-            elif chat_member.status == chat_member.BANNED:
-                logger.debug("User `%d` is banned. Skipping", user.telegram_id)
-                continue
-
-            is_nft_holder = wallet_service.is_nft_holder(
-                owner_address=user.wallet.address,
-                collection_address=userfriendly_to_raw(
-                    Config.TARGET_NFT_COLLECTION_ADDRESS
-                ),
-            )
+    async def check(user: User, holders: set[str]) -> None:
+        chat_member = await get_telegram_chat_member(context, user.telegram_id)
 
-            if not user.is_eligible_club_member(is_nft_holder=is_nft_holder):
+        if not user.wallet:
+            if chat_member and chat_member.status != ChatMember.BANNED:
                 if is_telegram_chat_admin(chat_member):
                     logger.warning(
-                        "User `%d` is not eligible to be a chat member, but is an admin. Skipping",
+                        "User `%d` has no wallet connected, but is an admin. Skipping",
                         user.telegram_id,
                     )
-                    continue
+                    return
 
                 logger.info("Removing user `%d` from the chat", user.telegram_id)
-                await context.bot.ban_chat_member(
-                    chat_id=Config.TARGET_COMMON_CHAT_ID,
-                    user_id=user.telegram_id,
-                    until_date=60,  # ban for a minute so that user can join again in a minute
+                await ban_telegram_chat_member(context, user.telegram_id)
+            else:
+                logger.debug(
+                    "User `%d` has no wallet connected. Skipping", user.telegram_id
                 )
+            return
+
+        if not chat_member:
+            logger.debug("User `%d` is not a chat member. Skipping", user.telegram_id)
+            return
+        elif chat_member.status == ChatMember.BANNED:
+            logger.debug("User `%d` is banned. Skipping", user.telegram_id)
+            return
+
+        is_nft_holder = user.wallet.address in holders
+        if not user.is_eligible_club_member(is_nft_holder=is_nft_holder):
+            if is_telegram_chat_admin(chat_member):
+                logger.warning(
+                    "User `%d` is not eligible to be a chat member, but is an admin. Skipping",
+                    user.telegram_id,
+                )
+                return
+
+            logger.info("Removing user `%d` from the chat", user.telegram_id)
+            await ban_telegram_chat_member(context, user.telegram_id)
 
-    logger.info("Sanity of chat members checked")
+    after_id = await cursor.get() or 0
+    slice_size = _sweep_slice_size(await run_in_db_executor(_count_users))
+    users = await run_in_db_executor(
+        load_prefetched_users,
+        after_id=after_id,
+        limit=slice_size,
+    )
+    unchecked = await recent_checks.filter_unchecked(
+        [user.telegram_id for user in users]
+    )
+    pending = [user for user in users if user.telegram_id in unchecked]
+    # One lookup for the whole slice instead of one per user
+    holders = await run_in_db_executor(
+        _holders_among,
+        [user.wallet.address for user in pending if user.wallet],
+        collection_address,
+    )
+
+    checked: list[User] = []
+    taken: list[User] = []
+
+    def within_budget() -> Iterator[User]:
+        for user in pending:
+            if time.monotonic() >= deadline:
+                return
+            taken.append(user)
+            yield user
+
+    async def check_and_mark(user: User) -> None:
+        await check(user, holders=holders)
+        checked.append(user)
+
+    report = await run_pool(within_budget(), check_and_mark, key=_telegram_id)
+    await recent_checks.mark([user.telegram_id for user in checked])
+    report.log("sanity_chat_members_check")
+
+    if len(taken) < len(pending):
+        # Out of time, continue after the last user sent to the pool
+        logger.warning(
+            "Sweep of chat members checked %d of %d users in time. "
+            "A pass may take longer than the sweep period",
+            len(taken),
+            len(pending),
+        )
+        await cursor.save(taken[-1].id if taken else after_id)
+    elif len(users) < slice_size:
+        logger.info("Sweep of chat members reached the last user, starting over")
+        await cursor.save(0)
+    else:
+        await cursor.save(users[-1].id)
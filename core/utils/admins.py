@@ -0,0 +1,76 @@
+import asyncio
+import logging
+import time
+
+from telegram import ChatMember
+from telegram.ext import ContextTypes
+
+from core.settings import Config
+from core.utils.membership import Membership
+
+
+logger = logging.getLogger(__name__)
+
+
+class AdminRegistry:
+    """
+    Administrators of the club chat by Telegram ID. Loaded from the Bot API
+    when the TTL expires and kept up to date by `chat_member` updates and
+    our own promotions in between.
+    """
+
+    def __init__(self, ttl: int) -> None:
+        self.ttl = ttl
+        self._admins: dict[int, Membership] = {}
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get_all(
+        self, context: ContextTypes.DEFAULT_TYPE
+    ) -> dict[int, Membership]:
+        if time.monotonic() >= self._expires_at:
+            async with self._lock:
+                # Another caller may have loaded the list while we waited
+                if time.monotonic() >= self._expires_at:
+                    await self._load(context)
+        return self._admins
+
+    async def get(
+        self, context: ContextTypes.DEFAULT_TYPE, telegram_id: int
+    ) -> Membership | None:
+        return (await self.get_all(context)).get(telegram_id)
+
+    async def _load(self, context: ContextTypes.DEFAULT_TYPE) -> None:
+        chat_members = await context.bot.get_chat_administrators(
+            chat_id=Config.TARGET_COMMON_CHAT_ID
+        )
+        self._admins = {
+            chat_member.user.id: Membership.from_chat_member(chat_member)
+            for chat_member in chat_members
+        }
+        self._expires_at = time.monotonic() + self.ttl
+        logger.info("Loaded %d chat administrators", len(self._admins))
+
+    def set(self, telegram_id: int, entry: Membership | None) -> None:
+        """
+        Record an administrator, or remove them if `entry` is None.
+        The dictionary is replaced, so readers iterating it are not affected.
+        """
+        admins = dict(self._admins)
+        if entry is None:
+            admins.pop(telegram_id, None)
+        else:
+            admins[telegram_id] = entry
+        self._admins = admins
+
+    def update(self, chat_member: ChatMember) -> None:
+        if chat_member.status in (ChatMember.ADMINISTRATOR, ChatMember.OWNER):
+            self.set(chat_member.user.id, Membership.from_chat_member(chat_member))
+        else:
+            self.set(chat_member.user.id, None)
+
+    def invalidate(self) -> None:
+        self._expires_at = 0.0
+
+
+admin_registry = AdminRegistry(ttl=Config.ADMINS_CACHE_TTL)
@@ -1,11 +1,13 @@
 import logging
 
-from telegram import ChatMember, ChatMemberAdministrator
+from telegram import ChatMember
 from telegram.error import TelegramError
 from telegram.ext import ContextTypes
 
 from core.models.user import User
 from core.settings import Config
+from core.utils.admins import admin_registry
+from core.utils.membership import Membership, membership_cache
 
 
 logger = logging.getLogger(__name__)
@@ -13,56 +15,64 @@ logger = logging.getLogger(__name__)
 
 async def get_telegram_chat_member(
     context: ContextTypes.DEFAULT_TYPE, telegram_id: int
-) -> ChatMember | None:
-    try:
-        chat_member = await context.bot.get_chat_member(
-            chat_id=Config.TARGET_COMMON_CHAT_ID,
-            user_id=telegram_id,
-        )
-        if chat_member is not None and chat_member.status in (ChatMember.LEFT,):
+) -> Membership | None:
+    """
+    Get membership of the user in the club chat, from the cache when present
+    :param context: bot context
+    :param telegram_id: Telegram ID of the user
+    :return: :class:`Membership`, None if the user is not in the chat
+    """
+    membership = await membership_cache.get(telegram_id)
+    if membership is None:
+        try:
+            chat_member = await context.bot.get_chat_member(
+                chat_id=Config.TARGET_COMMON_CHAT_ID,
+                user_id=telegram_id,
+            )
+        except TelegramError:
+            logger.warning(f"Failed to get chat member for {telegram_id}")
             return None
 
-        return chat_member
-    except TelegramError:
-        logger.warning(f"Failed to get chat member for {telegram_id}")
+        membership = Membership.from_chat_member(chat_member)
+        await membership_cache.set(telegram_id, membership)
+
+    if membership.status in (ChatMember.LEFT,):
         return None
 
+    return membership
 
-async def get_telegram_chat_admins(
-    context: ContextTypes.DEFAULT_TYPE,
-) -> list[ChatMember]:
-    return await context.bot.get_chat_administrators(
-        chat_id=Config.TARGET_COMMON_CHAT_ID
+
+async def ban_telegram_chat_member(
+    context: ContextTypes.DEFAULT_TYPE, telegram_id: int
+) -> None:
+    await context.bot.ban_chat_member(
+        chat_id=Config.TARGET_COMMON_CHAT_ID,
+        user_id=telegram_id,
+        until_date=60,  # ban for a minute so that user can join again in a minute
     )
+    # The ban is temporary, so read the status from the API next time
+    await membership_cache.delete(telegram_id)
 
 
-def get_user_from_chat_members(
-    chat_members: list[ChatMember], telegram_id: int
-) -> ChatMember | None:
-    for chat_member in chat_members:
-        if chat_member.user.id == telegram_id:
-            return chat_member
-    return None
+async def get_telegram_chat_admins(
+    context: ContextTypes.DEFAULT_TYPE,
+) -> dict[int, Membership]:
+    """
+    Get chat administrators by Telegram ID from the cached registry.
+    """
+    return await admin_registry.get_all(context)
 
 
-def is_telegram_chat_whale_admin(chat_member: ChatMember) -> bool:
+def is_telegram_chat_whale_admin(chat_member: Membership) -> bool:
     """
     Check if the chat member is a whale admin
     :param chat_member: Chat member to check
     :return: bool - True if the chat member is a whale admin, False otherwise
     """
-    if chat_member.status != ChatMember.ADMINISTRATOR or not isinstance(
-        chat_member, ChatMemberAdministrator
-    ):
-        return False
+    return chat_member.is_whale_admin
 
-    if chat_member.custom_title and chat_member.custom_title.startswith("8x"):
-        return True
 
-    return False
-
-
-def is_telegram_chat_admin(chat_member: ChatMember | ChatMemberAdministrator) -> bool:
+def is_telegram_chat_admin(chat_member: Membership) -> bool:
     """
     Check if the chat member is an admin that should never be demoted or banned
     :param chat_member: Chat member to check
@@ -91,6 +101,11 @@ async def promote_user(
     if not user.wallet.jetton_wallet.is_whale:
         return
 
+    admin = await admin_registry.get(context, user.telegram_id)
+    if admin and admin.custom_title == f"8x{user.wallet.jetton_wallet.rating}":
+        logger.debug(f"User `{user.telegram_id}` is already a whale admin")
+        return
+
     chat_member = await get_telegram_chat_member(
         context=context, telegram_id=user.telegram_id
     )
@@ -114,6 +129,12 @@ async def promote_user(
                     user_id=user.telegram_id,
                     custom_title=f"8x{user.wallet.jetton_wallet.rating}",
                 )
+                membership = Membership(
+                    status=chat_member.status,
+                    custom_title=f"8x{user.wallet.jetton_wallet.rating}",
+                )
+                admin_registry.set(user.telegram_id, membership)
+                await membership_cache.set(user.telegram_id, membership)
 
         return
 
@@ -133,6 +154,12 @@ async def promote_user(
         user_id=user.telegram_id,
         custom_title=f"8x{user.wallet.jetton_wallet.rating}",
     )
+    membership = Membership(
+        status=ChatMember.ADMINISTRATOR,
+        custom_title=f"8x{user.wallet.jetton_wallet.rating}",
+    )
+    admin_registry.set(user.telegram_id, membership)
+    await membership_cache.set(user.telegram_id, membership)
     await context.bot.send_message(
         chat_id=user.telegram_id,
         text=(
@@ -142,6 +169,10 @@ async def promote_user(
 
 
 async def demote_user(context: ContextTypes.DEFAULT_TYPE, telegram_id: int) -> None:
+    admin = await admin_registry.get(context, telegram_id)
+    if not admin or not admin.is_whale_admin:
+        return
+
     chat_member = await get_telegram_chat_member(
         context=context, telegram_id=telegram_id
     )
@@ -159,6 +190,8 @@ async def demote_user(context: ContextTypes.DEFAULT_TYPE, telegram_id: int) -> N
         user_id=telegram_id,
         can_manage_topics=False,
     )
+    admin_registry.set(telegram_id, None)
+    await membership_cache.set(telegram_id, Membership(status=ChatMember.MEMBER))
     await context.bot.send_message(
         chat_id=telegram_id,
         text="You've been demoted from admins in the chat as you lost your whale status!",
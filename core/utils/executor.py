@@ -0,0 +1,92 @@
+import asyncio
+import functools
+import logging
+from collections.abc import AsyncGenerator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Awaitable, Callable, TypeVar
+
+from telegram.ext import ContextTypes
+
+from core.constants import LOOP_LAG_PROBE_INTERVAL
+from core.settings import Config
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Background jobs only, so that they never take threads from update handlers
+db_executor = ThreadPoolExecutor(
+    max_workers=Config.DB_JOB_WORKERS, thread_name_prefix="db-job"
+)
+
+
+async def run_in_db_executor(func: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run blocking database work of a background job off the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        db_executor, functools.partial(func, *args, **kwargs)
+    )
+
+
+@dataclass
+class LoopLag:
+    total: float = 0.0
+    max: float = 0.0
+
+
+@asynccontextmanager
+async def monitor_loop_lag(name: str) -> AsyncGenerator[LoopLag, None]:
+    """
+    Measure how long the event loop was blocked while the job was running.
+
+    :param name: job name to log
+    """
+    lag = LoopLag()
+    loop = asyncio.get_running_loop()
+
+    async def probe() -> None:
+        while True:
+            start = loop.time()
+            await asyncio.sleep(LOOP_LAG_PROBE_INTERVAL)
+            delay = loop.time() - start - LOOP_LAG_PROBE_INTERVAL
+            if delay > 0:
+                lag.total += delay
+                lag.max = max(lag.max, delay)
+
+    task = asyncio.create_task(probe())
+    await asyncio.sleep(0)  # Start probing before the job gets the loop
+    try:
+        yield lag
+    finally:
+        task.cancel()
+        logger.info(
+            "Job `%s` blocked the event loop for %.3fs in total, %.3fs at most",
+            name,
+            lag.total,
+            lag.max,
+        )
+
+
+def background_job(
+    func: Callable[[ContextTypes.DEFAULT_TYPE], Awaitable[None]],
+) -> Callable[[ContextTypes.DEFAULT_TYPE], Awaitable[None]]:
+    """
+    Error boundary of a job queue callback. Watches the event loop lag of the
+    job and logs its failure with the traceback before reraising it.
+    """
+
+    @functools.wraps(func)
+    async def inner(context: ContextTypes.DEFAULT_TYPE) -> None:
+        async with monitor_loop_lag(func.__name__):
+            try:
+                await func(context)
+            except Exception:
+                logger.exception("Job `%s` failed", func.__name__)
+                raise  # Reraise the exception to logs
+
+    return inner
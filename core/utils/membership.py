@@ -0,0 +1,109 @@
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass
+
+from telegram import ChatMember
+
+from core.constants import (
+    MEMBERSHIP_CACHE_KEY,
+    MEMBERSHIP_LOCAL_CACHE_SIZE,
+    MEMBERSHIP_LOCAL_CACHE_TTL,
+)
+from core.settings import Config
+from core.utils.cache import redis_client
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Membership:
+    """Status of a user in the club chat, as much of it as the bot relies on."""
+
+    status: str
+    custom_title: str | None = None
+
+    @classmethod
+    def from_chat_member(cls, chat_member: ChatMember) -> "Membership":
+        return cls(
+            status=chat_member.status,
+            custom_title=getattr(chat_member, "custom_title", None),
+        )
+
+    @property
+    def is_whale_admin(self) -> bool:
+        return (
+            self.status == ChatMember.ADMINISTRATOR
+            and bool(self.custom_title)
+            and self.custom_title.startswith("8x")
+        )
+
+
+class MembershipCache:
+    """
+    Club chat membership by Telegram ID, kept in Redis with a small
+    in-process front. Entries are written from `chat_member` updates and
+    after our own promotions, and expire so that missed changes are
+    eventually read from the Bot API again.
+    """
+
+    def __init__(
+        self,
+        ttl: int,
+        key: str = MEMBERSHIP_CACHE_KEY,
+        local_ttl: int = MEMBERSHIP_LOCAL_CACHE_TTL,
+        local_size: int = MEMBERSHIP_LOCAL_CACHE_SIZE,
+    ) -> None:
+        self.ttl = ttl
+        self.key = key
+        self.local_ttl = local_ttl
+        self.local_size = local_size
+        # Insertion ordered, so the oldest entries are evicted first
+        self._local: dict[int, tuple[float, Membership]] = {}
+
+    def _key(self, telegram_id: int) -> str:
+        return f"{self.key}:{telegram_id}"
+
+    def _set_local(self, telegram_id: int, membership: Membership) -> None:
+        self._local.pop(telegram_id, None)
+        if len(self._local) >= self.local_size:
+            self._local.pop(next(iter(self._local)))
+        self._local[telegram_id] = (time.monotonic() + self.local_ttl, membership)
+
+    async def get(self, telegram_id: int) -> Membership | None:
+        """
+        :return: cached membership, None on a miss
+        """
+        cached = self._local.get(telegram_id)
+        if cached is not None:
+            expires_at, membership = cached
+            if time.monotonic() < expires_at:
+                return membership
+            self._local.pop(telegram_id, None)
+
+        value = await redis_client.get(self._key(telegram_id))
+        if not value:
+            return None
+
+        try:
+            membership = Membership(**json.loads(value))
+        except (TypeError, ValueError):
+            logger.warning("Invalid membership of `%d`: %s", telegram_id, value)
+            return None
+
+        self._set_local(telegram_id, membership)
+        return membership
+
+    async def set(self, telegram_id: int, membership: Membership) -> None:
+        self._set_local(telegram_id, membership)
+        await redis_client.setex(
+            self._key(telegram_id), self.ttl, json.dumps(asdict(membership))
+        )
+
+    async def delete(self, telegram_id: int) -> None:
+        self._local.pop(telegram_id, None)
+        await redis_client.delete(self._key(telegram_id))
+
+
+membership_cache = MembershipCache(ttl=Config.MEMBERSHIP_CACHE_TTL)
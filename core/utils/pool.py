@@ -0,0 +1,98 @@
+import asyncio
+import logging
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from typing import TypeVar
+
+from telegram.error import TelegramError
+
+from core.settings import Config
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class PoolReport:
+    processed: int = 0
+    # Keys of failed items by exception class name
+    failures: dict[str, list] = field(default_factory=lambda: defaultdict(list))
+
+    @property
+    def failed(self) -> int:
+        return sum(len(keys) for keys in self.failures.values())
+
+    def __iadd__(self, other: "PoolReport") -> "PoolReport":
+        self.processed += other.processed
+        for error, keys in other.failures.items():
+            self.failures[error].extend(keys)
+        return self
+
+    def log(self, name: str) -> None:
+        if not self.failures:
+            logger.info("Job `%s` processed %d items", name, self.processed)
+            return
+
+        logger.warning(
+            "Job `%s` processed %d items, %d failed: %s",
+            name,
+            self.processed,
+            self.failed,
+            "; ".join(
+                f"{error} x{len(keys)} (e.g. {', '.join(map(str, keys[:5]))})"
+                for error, keys in self.failures.items()
+            ),
+        )
+
+
+async def run_pool(
+    items: Iterable[T],
+    worker: Callable[[T], Awaitable[None]],
+    key: Callable[[T], object],
+    concurrency: int = Config.TELEGRAM_JOB_CONCURRENCY,
+) -> PoolReport:
+    """
+    Process items with a fixed number of concurrent workers. Each item is
+    handled by a single worker, so operations on one item stay ordered.
+    Bot API calls still go through the bot's rate limiter. Failures are
+    aggregated in the report instead of stopping the pool, unexpected ones
+    are logged with their traceback as well.
+
+    :param items: items to process
+    :param worker: coroutine function processing a single item
+    :param key: function returning the item key reported on failure
+    :param concurrency: number of workers
+    :return: :class:`PoolReport`
+    """
+    report = PoolReport()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+
+    async def consume() -> None:
+        while (item := await queue.get()) is not None:
+            try:
+                await worker(item)
+            except TelegramError as exc:
+                # Expected per-user API failures are only summarized
+                logger.debug("Failed to process `%s`", key(item), exc_info=True)
+                report.failures[type(exc).__name__].append(key(item))
+            except Exception as exc:
+                logger.exception("Failed to process `%s`", key(item))
+                report.failures[type(exc).__name__].append(key(item))
+            finally:
+                report.processed += 1
+
+    workers = [asyncio.create_task(consume()) for _ in range(concurrency)]
+    try:
+        for item in items:
+            await queue.put(item)
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers:
+            task.cancel()
+
+    return report
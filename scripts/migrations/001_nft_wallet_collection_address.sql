@@ -0,0 +1,5 @@
+-- NFT syncs read and retire items of a collection, which the
+-- (owner_address, collection_address) index can't serve.
+
+ALTER TABLE `nft_wallet`
+    ADD INDEX `nft_wallet_collection_address` (`collection_address`);
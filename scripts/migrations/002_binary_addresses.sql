@@ -0,0 +1,104 @@
+-- Store addresses as 33 bytes: signed workchain byte and 32-byte hash
+-- (see `core.models.types.RawAddress`). Columns go through VARBINARY so that
+-- primary keys and indexes are kept while raw `workchain:hex` values are
+-- converted in place.
+
+-- MySQL refuses to change the type of a foreign key column, and the model
+-- no longer declares the baseline `user_wallet.jetton_wallet_address` ->
+-- `jetton_wallet.owner_address` key. Its name was generated by MySQL, so it
+-- is looked up. The index backing it is replaced by the one of the model.
+SET @fk_name = (
+    SELECT `CONSTRAINT_NAME` FROM `information_schema`.`KEY_COLUMN_USAGE`
+    WHERE `TABLE_SCHEMA` = DATABASE()
+        AND `TABLE_NAME` = 'user_wallet'
+        AND `COLUMN_NAME` = 'jetton_wallet_address'
+        AND `REFERENCED_TABLE_NAME` = 'jetton_wallet'
+    LIMIT 1
+);
+SET @sql = IF(
+    @fk_name IS NULL,
+    'DO 0',
+    CONCAT('ALTER TABLE `user_wallet` DROP FOREIGN KEY `', @fk_name, '`')
+);
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @index_name = (
+    SELECT `INDEX_NAME` FROM `information_schema`.`STATISTICS`
+    WHERE `TABLE_SCHEMA` = DATABASE()
+        AND `TABLE_NAME` = 'user_wallet'
+        AND `COLUMN_NAME` = 'jetton_wallet_address'
+        AND `INDEX_NAME` != 'ix_user_wallet_jetton_wallet_address'
+    LIMIT 1
+);
+SET @sql = IF(
+    @index_name IS NULL,
+    'DO 0',
+    CONCAT('ALTER TABLE `user_wallet` DROP INDEX `', @index_name, '`')
+);
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @sql = IF(
+    EXISTS(
+        SELECT 1 FROM `information_schema`.`STATISTICS`
+        WHERE `TABLE_SCHEMA` = DATABASE()
+            AND `TABLE_NAME` = 'user_wallet'
+            AND `INDEX_NAME` = 'ix_user_wallet_jetton_wallet_address'
+    ),
+    'DO 0',
+    'ALTER TABLE `user_wallet` ADD INDEX `ix_user_wallet_jetton_wallet_address` (`jetton_wallet_address`)'
+);
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+ALTER TABLE `user_wallet`
+    MODIFY `address` VARBINARY(255) NOT NULL,
+    MODIFY `jetton_wallet_address` VARBINARY(255) NULL;
+UPDATE `user_wallet` SET
+    `address` = CONCAT(
+        UNHEX(LPAD(HEX(CAST(SUBSTRING_INDEX(`address`, ':', 1) AS SIGNED) & 255), 2, '0')),
+        UNHEX(SUBSTRING_INDEX(`address`, ':', -1))
+    ),
+    `jetton_wallet_address` = CONCAT(
+        UNHEX(LPAD(HEX(CAST(SUBSTRING_INDEX(`jetton_wallet_address`, ':', 1) AS SIGNED) & 255), 2, '0')),
+        UNHEX(SUBSTRING_INDEX(`jetton_wallet_address`, ':', -1))
+    );
+ALTER TABLE `user_wallet`
+    MODIFY `address` BINARY(33) NOT NULL,
+    MODIFY `jetton_wallet_address` BINARY(33) NULL;
+
+ALTER TABLE `jetton_wallet`
+    MODIFY `owner_address` VARBINARY(255) NOT NULL;
+UPDATE `jetton_wallet` SET
+    `owner_address` = CONCAT(
+        UNHEX(LPAD(HEX(CAST(SUBSTRING_INDEX(`owner_address`, ':', 1) AS SIGNED) & 255), 2, '0')),
+        UNHEX(SUBSTRING_INDEX(`owner_address`, ':', -1))
+    );
+ALTER TABLE `jetton_wallet`
+    MODIFY `owner_address` BINARY(33) NOT NULL;
+
+ALTER TABLE `nft_wallet`
+    MODIFY `item_address` VARBINARY(255) NOT NULL,
+    MODIFY `owner_address` VARBINARY(255) NOT NULL,
+    MODIFY `collection_address` VARBINARY(255) NOT NULL;
+UPDATE `nft_wallet` SET
+    `item_address` = CONCAT(
+        UNHEX(LPAD(HEX(CAST(SUBSTRING_INDEX(`item_address`, ':', 1) AS SIGNED) & 255), 2, '0')),
+        UNHEX(SUBSTRING_INDEX(`item_address`, ':', -1))
+    ),
+    `owner_address` = CONCAT(
+        UNHEX(LPAD(HEX(CAST(SUBSTRING_INDEX(`owner_address`, ':', 1) AS SIGNED) & 255), 2, '0')),
+        UNHEX(SUBSTRING_INDEX(`owner_address`, ':', -1))
+    ),
+    `collection_address` = CONCAT(
+        UNHEX(LPAD(HEX(CAST(SUBSTRING_INDEX(`collection_address`, ':', 1) AS SIGNED) & 255), 2, '0')),
+        UNHEX(SUBSTRING_INDEX(`collection_address`, ':', -1))
+    );
+ALTER TABLE `nft_wallet`
+    MODIFY `item_address` BINARY(33) NOT NULL,
+    MODIFY `owner_address` BINARY(33) NOT NULL,
+    MODIFY `collection_address` BINARY(33) NOT NULL;
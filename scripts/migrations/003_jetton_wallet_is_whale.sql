@@ -0,0 +1,11 @@
+-- Whale status is computed by holders syncs. Existing rows are backfilled,
+-- so that admins are not demoted as non-whales before the next snapshot.
+
+ALTER TABLE `jetton_wallet`
+    ADD COLUMN `is_whale` BOOL NOT NULL DEFAULT 0,
+    ADD INDEX `ix_jetton_wallet_is_whale` (`is_whale`);
+
+-- Adjust the thresholds if WHALE_RATING_THRESHOLD or WHALE_BALANCE_THRESHOLD
+-- differ from the defaults. The balance is in nano units.
+UPDATE `jetton_wallet`
+SET `is_whale` = `rating` <= 90 AND `balance` >= 1000000 * 1000000000;